@@ -10,6 +10,34 @@ from ._scalers import Binarizer
 from ._encoders import OneHotEncoder
 from ._encoders import OrdinalEncoder
 from ._encoders import LabelEncoder
+from ._encoders import HashingEncoder
+
+# Pipeline
+from ._pipeline import fit_all
+from ._pipeline import Pipeline
+
+# Persistence
+from ._persistence import set_fit_cache
+
+# Data loading
+from ._loader import load_training_data
+from ._loader import iter_training_batches
+
+# Profiling
+from ._profile import profile
+
+# Model selection, tuning, metrics and scoring
+from . import model_selection
+from . import tuning
+from . import metrics
+from . import scoring
+
+# UDF
+from ._udf import udf_transform
+from ._udf import UdfTransformPlan
+from ._udf import compile_udf_encoders
+from ._udf import load_udf_plan
+from ._udf import sparse_to_csr
 
 __all__ = [
     "MinMaxScaler",
@@ -21,4 +49,20 @@ __all__ = [
     "OneHotEncoder",
     "OrdinalEncoder",
     "LabelEncoder",
+    "HashingEncoder",
+    "fit_all",
+    "Pipeline",
+    "set_fit_cache",
+    "load_training_data",
+    "iter_training_batches",
+    "profile",
+    "model_selection",
+    "tuning",
+    "metrics",
+    "scoring",
+    "udf_transform",
+    "UdfTransformPlan",
+    "compile_udf_encoders",
+    "load_udf_plan",
+    "sparse_to_csr",
 ]
\ No newline at end of file
@@ -1,22 +1,30 @@
 from typing import Tuple, Union, List, Optional, Dict
 
-from snowflake.snowpark import DataFrame
+from snowflake.snowpark import DataFrame, Session, Window
 import snowflake.snowpark.functions as F
 # from snowflake.snowpark import types as T
 import json
 
-from ._utilities import _check_fitted, _generate_udf_encoder, _columns_in_dataframe
+from ._utilities import _check_fitted, _generate_udf_encoder, _columns_in_dataframe, _collect_fitted_values, \
+    _normalize_col_name, _get_columns, _seed_columns, _derive_columns, _with_columns
+from ._local import _is_local_df, _resolve_local_input_cols, _local_fit, _local_transform, _local_inverse_transform
+from ._persistence import _save_transformer, _load_transformer, _get_fit_cache_path, _load_fit_cache, \
+    _save_fit_cache
 
 __all__ = [
     "OneHotEncoder",
     "LabelEncoder",
     "OrdinalEncoder",
+    "HashingEncoder",
 ]
 
+# Prefix of the intermediate columns with the bucket of each input column, used by HashingEncoder.transform
+_BUCKET_COL_PREFIX = "HASHING_BUCKET_"
+
 
 def _check_input_columns(df, input_columns):
     if not input_columns:
-        input_columns = df.columns
+        input_columns = _get_columns(df)
     else:
         # Check if list
         if not isinstance(input_columns, list):
@@ -25,38 +33,94 @@ def _check_input_columns(df, input_columns):
     return input_columns
 
 
-def _get_categories(df, categories, cat_cols):
+def _get_categories_exprs(categories, cat_cols):
     # {"COL1": ["cat1", "cat2", ...], "COL2": [...]}
-    categories_ = []
+    object_const = []
     if categories == "auto":
-        object_const = []
         for col in cat_cols:
             object_const.extend([F.lit(col), F.array_agg(F.to_varchar(col), is_distinct=True).within_group(
                 F.to_varchar(F.col(col)).asc())])
-        df_categories = df.select(F.object_construct(*object_const).as_("CATS"))
-        categories_ = json.loads(df_categories.collect()[0][0])
-    else:  # If categories has already been defined...
-        # if self.handle_unknown == "error":
-        # Check so we does not have new
-        categories_ = categories
 
-    return categories_
+    return object_const
+
+
+def _check_frequency_params(max_categories, min_frequency):
+    if max_categories is not None and (not isinstance(max_categories, int) or max_categories < 1):
+        raise ValueError(f"max_categories {max_categories} needs to be a Integer larger than 0")
+    if min_frequency is not None:
+        if isinstance(min_frequency, float):
+            if not 0.0 < min_frequency < 1.0:
+                raise ValueError(f"min_frequency {min_frequency} needs to be between 0.0 and 1.0 when it is a Float")
+        elif not isinstance(min_frequency, int) or min_frequency < 1:
+            raise ValueError(f"min_frequency {min_frequency} needs to be a Integer larger than 0 or a Float")
+
+
+def _infrequent_enabled(encoder) -> bool:
+    # Categories are only limited when they are found by fit
+    if getattr(encoder, "categories", None) != "auto":
+        return False
+
+    return getattr(encoder, "max_categories", None) is not None or getattr(encoder, "min_frequency", None) is not None
+
+
+def _get_frequent_categories(df, cat_cols, max_categories=None, min_frequency=None) -> Dict:
+    # {"COL1": ["cat1", "cat2", ...], "COL2": [...]} with only the most frequent categories of each column.
+    # All columns are unpivoted into KEY, VALUE rows so the frequencies are counted with one GROUP BY, NULL values
+    # are dropped by object_construct
+    obj_const = []
+    for col in cat_cols:
+        obj_const.extend([F.lit(col), F.to_varchar(col)])
+
+    df_cats = df.select(F.object_construct(*obj_const).as_("CATS")).join_table_function("flatten", F.col("CATS"))
+    df_freq = df_cats.select(F.col("KEY"), F.to_varchar(F.col("VALUE")).as_("CAT")).group_by(["KEY", "CAT"]).agg(
+        F.count(F.lit(1)).as_("FREQ"))
+
+    # Window functions can not be used in WHERE, so they are added as columns before filtering
+    if min_frequency is not None:
+        if isinstance(min_frequency, float):
+            df_freq = df_freq.with_column(
+                "MIN_FREQ", F.sum(F.col("FREQ")).over(Window.partition_by(F.col("KEY"))) * F.lit(min_frequency))
+        else:
+            df_freq = df_freq.with_column("MIN_FREQ", F.lit(min_frequency))
+        df_freq = df_freq.filter(F.col("FREQ") >= F.col("MIN_FREQ"))
+
+    if max_categories is not None:
+        rank_window = Window.partition_by(F.col("KEY")).order_by(F.col("FREQ").desc(), F.col("CAT").asc())
+        df_freq = df_freq.with_column("FREQ_RANK", F.row_number().over(rank_window))
+        df_freq = df_freq.filter(F.col("FREQ_RANK") <= F.lit(max_categories))
+
+    df_categories = df_freq.group_by(F.col("KEY")).agg(
+        F.array_agg(F.col("CAT")).within_group(F.col("CAT").asc()).as_("CATEGORIES"))
+
+    # Columns where all categories are infrequent will not be in the result
+    fitted_values = {col: [] for col in cat_cols}
+    for row in df_categories.collect():
+        fitted_values[row[0]] = json.loads(row[1])
+
+    return fitted_values
 
 
-def _generate_label_where(encoder):
+def _generate_label_where(encoder, get_col=F.col, encode_cols=None):
 
     col_exprs = []
-    encode_cols = encoder.input_cols
+    if encode_cols is None:
+        encode_cols = encoder.input_cols
     fitted_values = encoder.fitted_values_
+    infrequent = _infrequent_enabled(encoder)
 
     for col in encode_cols:
         with_expr = None
+        if infrequent:
+            # Infrequent and unknown categories gets the index after the last kept category, NULL stays NULL
+            with_expr = F.when(get_col(col).is_null(), F.lit(None))
         for idx, cat in enumerate(fitted_values[col]):
             if type(with_expr) == F.CaseExpr:
-                with_expr = with_expr.when(F.col(col) == F.lit(cat), F.lit(idx))
+                with_expr = with_expr.when(get_col(col) == F.lit(cat), F.lit(idx))
             else:
-                with_expr = F.when(F.col(col) == F.lit(cat), F.lit(idx))
-        if hasattr(encoder, 'handle_unknown'):
+                with_expr = F.when(get_col(col) == F.lit(cat), F.lit(idx))
+        if infrequent:
+            with_expr = with_expr.otherwise(F.lit(len(fitted_values[col])))
+        elif hasattr(encoder, 'handle_unknown'):
             if encoder.handle_unknown == "use_encoded_value":
                 with_expr = with_expr.otherwise(F.lit(encoder.unknown_value))
 
@@ -65,20 +129,96 @@ def _generate_label_where(encoder):
     return col_exprs
 
 
-def _generate_inverse_sql(encoder):
-    output_cols = encoder.output_cols
+def _use_join(encoder, col=None) -> bool:
+    # If col is not provided, check if any of the input columns is encoded using a join
+    if col is None:
+        input_cols = encoder.input_cols
+        if not isinstance(input_cols, list):
+            input_cols = [input_cols]
+        return any(_use_join(encoder, in_col) for in_col in input_cols)
+
+    if encoder.strategy == "join":
+        return True
+    if encoder.strategy == "auto":
+        return len(encoder.fitted_values_[col]) > encoder.join_threshold
+
+    return False
+
+
+def _check_strategy(strategy):
+    if strategy not in ("auto", "case", "join"):
+        raise ValueError(f"strategy {strategy} is not supported, use 'auto', 'case' or 'join'")
+
+
+def _get_mapping_df(session, categories, cat_col, idx_col) -> DataFrame:
+    # Small mappings are inlined as VALUES, larger ones are uploaded as a temporary table by Snowpark
+    return session.create_dataframe([[cat, idx] for idx, cat in enumerate(categories)], schema=[cat_col, idx_col])
+
+
+def _join_labels(encoder, df, in_col, out_col) -> DataFrame:
+    key_col = f'"{_normalize_col_name(in_col)}__KEY"'
+    idx_col = f'"{_normalize_col_name(in_col)}__IDX"'
+    df_mapping = _get_mapping_df(df.session, encoder.fitted_values_[in_col], key_col, idx_col)
+
+    ret_df = df.join(df_mapping, F.to_varchar(df[in_col]) == df_mapping[key_col], join_type="left")
+
+    idx_expr = F.col(idx_col)
+    if _infrequent_enabled(encoder):
+        nbr_categories = len(encoder.fitted_values_[in_col])
+        idx_expr = F.iff(F.col(in_col).is_null(), F.lit(None), F.coalesce(idx_expr, F.lit(nbr_categories)))
+    elif getattr(encoder, "handle_unknown", None) == "use_encoded_value":
+        idx_expr = F.coalesce(idx_expr, F.lit(encoder.unknown_value))
+
+    ret_df = ret_df.with_column(out_col, idx_expr).drop([key_col, idx_col])
+
+    return _seed_columns(ret_df, _derive_columns(df, [out_col]))
+
+
+def _transform_labels(encoder, df, output_cols) -> DataFrame:
+    # Columns with many categories are encoded by a join with a mapping table, the others using CASE WHEN
+    input_output = [list(i) for i in zip(encoder.input_cols, output_cols)]
+
+    case_cols = [in_out for in_out in input_output if not _use_join(encoder, in_out[0])]
+    if case_cols:
+        col_exprs = _generate_label_where(encoder, F.col, [in_out[0] for in_out in case_cols])
+        df = _with_columns(df, [in_out[1] for in_out in case_cols], col_exprs)
 
+    for in_col, out_col in input_output:
+        if _use_join(encoder, in_col):
+            df = _join_labels(encoder, df, in_col, out_col)
+
+    return df
+
+
+def _join_inverse_labels(encoder, df, in_col, out_col) -> DataFrame:
+    key_col = f'"{_normalize_col_name(in_col)}__KEY"'
+    idx_col = f'"{_normalize_col_name(in_col)}__IDX"'
+    df_mapping = _get_mapping_df(df.session, encoder.fitted_values_[in_col], key_col, idx_col)
+
+    ret_df = df.join(df_mapping, df[out_col] == df_mapping[idx_col], join_type="left")
+    ret_df = ret_df.with_column(out_col, F.col(key_col)).drop([key_col, idx_col])
+
+    return _seed_columns(ret_df, _derive_columns(df, [out_col]))
+
+
+def _inverse_labels(encoder, df) -> DataFrame:
+    # The indexes are looked up in an ARRAY_CONSTRUCT of constants, that is only built once per query, or for columns
+    # with many categories joined with a mapping table. Unknown and infrequent indexes are decoded to NULL
+    input_output = [list(i) for i in zip(encoder.input_cols, encoder.output_cols)]
     fitted_values = encoder.fitted_values_
 
-    input_cols = encoder.input_cols
+    case_cols = [in_out for in_out in input_output if not _use_join(encoder, in_out[0])]
+    if case_cols:
+        col_exprs = [F.as_char(F.get(F.array_construct(*[F.lit(cat) for cat in fitted_values[in_col]]),
+                                     F.col(out_col)))
+                     for in_col, out_col in case_cols]
+        df = _with_columns(df, [in_out[1] for in_out in case_cols], col_exprs)
 
-    input_output = [list(i) for i in zip(input_cols, output_cols)]
-    col_sql_expr = []
     for in_col, out_col in input_output:
-        sql = f"AS_CHAR(PARSE_JSON('{json.dumps(fitted_values[in_col])}')[{out_col}])"
-        col_sql_expr.append(F.sql_expr(sql))
+        if _use_join(encoder, in_col):
+            df = _join_inverse_labels(encoder, df, in_col, out_col)
 
-    return col_sql_expr
+    return df
 
 
 class OneHotEncoder:
@@ -89,7 +229,11 @@ class OneHotEncoder:
             output_cols: Optional[Union[Dict, str]] = None,
             categories="auto",
             handle_unknown='ignore',
-            drop_input_cols=True
+            drop_input_cols=True,
+            max_categories: Optional[int] = None,
+            min_frequency: Optional[Union[int, float]] = None,
+            output: str = "dense",
+            sparse_col: str = "ONE_HOT_INDICES",
     ):
         """
         Encode categorical features as a one-hot.
@@ -105,12 +249,31 @@ class OneHotEncoder:
                                 When set to ‘keep’, a new column is added during transform where unknown values get a 1
                                 In inverse_transform, an unknown category will always be returned as NULL
         :param drop_input_cols: True/False if input columns should be dropped from the encoded DataFrame
+        :param max_categories: Only keep the max_categories most frequent categories of each input column when
+                               categories is "auto"
+        :param min_frequency: Only keep categories that occurs at least min_frequency times, or for a float, in at least
+                              that fraction of the non NULL rows, when categories is "auto".
+                              When max_categories or min_frequency is used, a column named <input column>__infrequent
+                              is added during transform where infrequent and unknown values get a 1, it replaces
+                              the <input column>__unknown column of handle_unknown='keep'
+        :param output: 'dense' or 'sparse'. With 'dense' each category is a column of its own, with 'sparse' one ARRAY
+                       column, sparse_col, is added with the indices of the categories set to 1 for all input columns.
+                       The index of each category is its position in get_feature_names()
+        :param sparse_col: Name of the column with the indices when output is 'sparse'
         """
+        _check_frequency_params(max_categories, min_frequency)
+        if output not in ("dense", "sparse"):
+            raise ValueError(f"output {output} is not supported, use 'dense' or 'sparse'")
+
         self.input_cols = input_cols
         self.output_cols = output_cols
         self.categories = categories
         self.handle_unknown = handle_unknown
         self.drop_input_cols = drop_input_cols
+        self.max_categories = max_categories
+        self.min_frequency = min_frequency
+        self.output = output
+        self.sparse_col = sparse_col
 
     def _check_output_columns(self):
         #  {"COL1": [cat1, cat2, ...], "COL2": [cat1, cat2, ...]}
@@ -142,12 +305,40 @@ class OneHotEncoder:
                 needed_cols += len(uniq_vals)
 
         # Snowflake can handle more columns,but it is depended on data type so let's keep it safe and limit to  3k
-        if needed_cols > 3000:
+        if self.output == "dense" and needed_cols > 3000:
             raise ValueError(
                 "To many categories, maximum 3000 is allowed")
 
         return cat_cols
 
+    def _get_extra_suffix(self) -> Optional[str]:
+        # Suffix of the column flagging values that are not one of the categories
+        if _infrequent_enabled(self):
+            return '__infrequent'
+        if self.handle_unknown == 'keep':
+            return '__unknown'
+
+        return None
+
+    def get_feature_names(self) -> List[str]:
+        """
+        Returns the names of the encoded columns, in the same order as the indices used when output is 'sparse'.
+
+        :return: List of column names
+        """
+        _check_fitted(self)
+        output_cols = self._check_output_columns()
+        self.output_cols = output_cols
+
+        suffix = self._get_extra_suffix()
+        feature_names = []
+        for col in self.input_cols:
+            feature_names.extend(output_cols[col])
+            if suffix:
+                feature_names.append(col + suffix)
+
+        return feature_names
+
     def fit(self, df: DataFrame) -> object:
         """
         Fit the OneHotEncoder using df.
@@ -155,14 +346,38 @@ class OneHotEncoder:
         :param df: Snowpark DataFrame used for getting the categories for each input column
         :return: Fitted encoder
         """
-        #
+        if _is_local_df(df):
+            return _local_fit(self, df)
 
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self
+
+        obj_const_log = self._get_fit_exprs(df)
+        if obj_const_log is None:
+            fitted_values = _get_frequent_categories(df, self.input_cols, self.max_categories, self.min_frequency)
+        else:
+            fitted_values = _collect_fitted_values(df, obj_const_log)
+        self._set_fitted_values(fitted_values)
+        _save_fit_cache(self, df, cache_path)
+
+        return self
+
+    def _get_fit_exprs(self, df: DataFrame) -> List:
         encode_cols = _check_input_columns(df, self.input_cols)
         self.input_cols = encode_cols
 
-        self.fitted_values_ = _get_categories(df, self.categories, encode_cols)
+        # The frequencies can not be part of a single row aggregation, they are fitted with a separate query
+        if _infrequent_enabled(self):
+            return None
 
-        return self
+        return _get_categories_exprs(self.categories, encode_cols)
+
+    def _set_fitted_values(self, fitted_values: Dict):
+        if self.categories != "auto":
+            fitted_values = self.categories
+
+        self.fitted_values_ = fitted_values
 
     def transform(self, df: DataFrame) -> DataFrame:
         """
@@ -173,26 +388,63 @@ class OneHotEncoder:
         :param df: Snowpark DataFrame to transform
         :return: Encoded Snowpark DataFrame
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         _check_fitted(self)
 
+        # Check for new categories?
+
+        # All indicator columns are added in one projection followed by one drop of the input columns
+        new_cols, col_exprs, drop_cols = self._get_transform_exprs(F.col)
+
+        return _with_columns(df, new_cols, col_exprs, drop_cols)
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
         encode_cols = self.input_cols
 
         output_cols = self._check_output_columns()
         self.output_cols = output_cols
 
-        # Check for new categories?
+        drop_cols = encode_cols if self.drop_input_cols else []
+
+        if self.output == "sparse":
+            return [self.sparse_col], [self._get_sparse_expr(get_col)], drop_cols
 
+        new_cols = []
+        col_exprs = []
         for col in encode_cols:
             uniq_vals = self.fitted_values_[col]
-            col_names = output_cols[col]
-            df = df.with_columns(col_names, [F.iff(F.col(col) == val, F.lit(1), F.lit(0)) for val in uniq_vals])
-            if self.handle_unknown == 'keep':
-                df = df.with_column(col + '__unknown', F.iff(~ F.col(col).in_(uniq_vals), F.lit(1), F.lit(0)))
-
-            if self.drop_input_cols:
-                df = df.drop(col)
+            new_cols.extend(output_cols[col])
+            col_exprs.extend([F.iff(get_col(col) == val, F.lit(1), F.lit(0)) for val in uniq_vals])
+            if _infrequent_enabled(self):
+                new_cols.append(col + '__infrequent')
+                col_exprs.append(F.iff(~ get_col(col).in_(uniq_vals), F.lit(1), F.lit(0)) if uniq_vals else
+                                 F.iff(get_col(col).is_null(), F.lit(0), F.lit(1)))
+            elif self.handle_unknown == 'keep':
+                new_cols.append(col + '__unknown')
+                col_exprs.append(F.iff(~ get_col(col).in_(uniq_vals), F.lit(1), F.lit(0)))
+
+        return new_cols, col_exprs, drop_cols
+
+    def _get_sparse_expr(self, get_col):
+        # One array per row with the index of the category of each input column, NULL values are left out by
+        # ARRAY_CONSTRUCT_COMPACT. ARRAY_POSITION keeps the SQL small also for columns with many categories
+        suffix = self._get_extra_suffix()
+        idx_exprs = []
+        offset = 0
+        for col in self.input_cols:
+            uniq_vals = self.fitted_values_[col]
+            categories = F.array_construct(*[F.lit(val) for val in uniq_vals])
+            idx_expr = F.array_position(F.to_variant(F.to_varchar(get_col(col))), categories) + F.lit(offset)
+            if suffix:
+                idx_expr = F.iff(get_col(col).is_null(), F.lit(None),
+                                 F.coalesce(idx_expr, F.lit(offset + len(uniq_vals))))
+                offset += 1
+            idx_exprs.append(idx_expr)
+            offset += len(uniq_vals)
 
-        return df
+        return F.array_construct_compact(*idx_exprs)
 
     def fit_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -211,8 +463,14 @@ class OneHotEncoder:
         :param df: Snowpark DataFrame to reverse the encoding.
         :return: Reversed Snowpark DataFrame
         """
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
+
         _check_fitted(self)
 
+        if self.output == "sparse":
+            return self._inverse_transform_sparse(df)
+
         # We assume that columns in the input
         output_cols = self.output_cols
         # Verify that the df have the output columns
@@ -236,14 +494,39 @@ class OneHotEncoder:
 
             col_exprs.append(with_expr)
 
-        ret_df = df.with_columns(new_output_cols, col_exprs)
-        ret_df = ret_df.drop(verify_cols)
-        if self.handle_unknown == 'keep':
-            unk_cols = []
+        drop_cols = list(verify_cols)
+        if _infrequent_enabled(self):
+            drop_cols.extend([col + '__infrequent' for col in output_cols])
+        elif self.handle_unknown == 'keep':
             for col in output_cols:
-                unk_cols.append(col + '__unknown')
-            ret_df = ret_df.drop(unk_cols)
-        return ret_df
+                drop_cols.append(col + '__unknown')
+
+        return _with_columns(df, new_output_cols, col_exprs, drop_cols)
+
+    def _inverse_transform_sparse(self, df: DataFrame) -> DataFrame:
+        _columns_in_dataframe([self.sparse_col], df)
+
+        indices = F.col(self.sparse_col)
+        suffix = self._get_extra_suffix()
+        col_exprs = []
+        offset = 0
+        for pos, col in enumerate(self.input_cols):
+            uniq_vals = self.fitted_values_[col]
+            categories = F.array_construct(*[F.lit(val) for val in uniq_vals])
+            # Indices of NULL values are left out, so the index of the column is at position pos or before
+            with_expr = None
+            for arr_pos in range(pos + 1):
+                idx = F.as_integer(F.get(indices, F.lit(arr_pos)))
+                in_col = (idx >= F.lit(offset)) & (idx < F.lit(offset + len(uniq_vals)))
+                value = F.as_char(F.get(categories, idx - F.lit(offset)))
+                if type(with_expr) == F.CaseExpr:
+                    with_expr = with_expr.when(in_col, value)
+                else:
+                    with_expr = F.when(in_col, value)
+            col_exprs.append(with_expr)
+            offset += len(uniq_vals) + (1 if suffix else 0)
+
+        return _with_columns(df, self.input_cols, col_exprs, [self.sparse_col])
 
     def get_udf_encoder(self) -> Dict:
         """
@@ -256,7 +539,33 @@ class OneHotEncoder:
         output_cols = self._check_output_columns()
         self.output_cols = output_cols
 
-        return _generate_udf_encoder(self)
+        udf_encoder = _generate_udf_encoder(self)
+        udf_encoder["drop_input_cols"] = self.drop_input_cols
+        udf_encoder["infrequent"] = _infrequent_enabled(self)
+        udf_encoder["output"] = self.output
+        udf_encoder["sparse_col"] = self.sparse_col
+
+        return udf_encoder
+
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the OneHotEncoder as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "OneHotEncoder":
+        """
+        Load a OneHotEncoder saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: OneHotEncoder
+        """
+        return _load_transformer(cls, path, session)
 
 
 class OrdinalEncoder:
@@ -268,6 +577,10 @@ class OrdinalEncoder:
             categories="auto",
             handle_unknown="ignored",
             unknown_value=None,
+            strategy="auto",
+            join_threshold=100,
+            max_categories: Optional[int] = None,
+            min_frequency: Optional[Union[int, float]] = None,
     ):
         """
         Encodes a string column of labels to a column of label indices. The indices are in [0, number of labels].
@@ -284,13 +597,30 @@ class OrdinalEncoder:
         :param unknown_value: When the parameter handle_unknown is set to ‘use_encoded_value’, this parameter is
                                required and will set the encoded value of unknown categories. It has to be distinct
                                from the values used to encode any of the categories
+        :param strategy: 'case', 'join' or 'auto'. With 'case' each category is a branch in a CASE WHEN expression,
+                         with 'join' the categories are put in a mapping table that is joined with the DataFrame.
+                         'auto' uses 'join' for columns with more categories than join_threshold
+        :param join_threshold: Number of categories above which a join is used when strategy is 'auto'
+        :param max_categories: Only keep the max_categories most frequent categories of each input column when
+                               categories is "auto"
+        :param min_frequency: Only keep categories that occurs at least min_frequency times, or for a float, in at least
+                              that fraction of the non NULL rows, when categories is "auto".
+                              When max_categories or min_frequency is used, infrequent and unknown categories are
+                              encoded as the number of kept categories, this takes precedence over handle_unknown
 
         """
+        _check_strategy(strategy)
+        _check_frequency_params(max_categories, min_frequency)
+
         self.input_cols = input_cols
         self.output_cols = output_cols
         self.categories = categories
         self.handle_unknown = handle_unknown
         self.unknown_value = unknown_value
+        self.strategy = strategy
+        self.join_threshold = join_threshold
+        self.max_categories = max_categories
+        self.min_frequency = min_frequency
 
     def fit(self, df: DataFrame) -> object:
         """
@@ -299,6 +629,24 @@ class OrdinalEncoder:
         :param df: Snowpark DataFrame used for getting the categories for each input column
         :return: Fitted encoder
         """
+        if _is_local_df(df):
+            return _local_fit(self, df)
+
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self
+
+        obj_const_log = self._get_fit_exprs(df)
+        if obj_const_log is None:
+            fitted_values = _get_frequent_categories(df, self.input_cols, self.max_categories, self.min_frequency)
+        else:
+            fitted_values = _collect_fitted_values(df, obj_const_log)
+        self._set_fitted_values(fitted_values)
+        _save_fit_cache(self, df, cache_path)
+
+        return self
+
+    def _get_fit_exprs(self, df: DataFrame) -> List:
         encode_cols = _check_input_columns(df, self.input_cols)
         self.input_cols = encode_cols
 
@@ -308,7 +656,17 @@ class OrdinalEncoder:
         elif self.unknown_value is not None:
             raise ValueError(f"unknown_value can only be used with handle_unknown = 'use_encoded_value'")
 
-        self.fitted_values_ = _get_categories(df, self.categories, encode_cols)
+        # The frequencies can not be part of a single row aggregation, they are fitted with a separate query
+        if _infrequent_enabled(self):
+            return None
+
+        return _get_categories_exprs(self.categories, encode_cols)
+
+    def _set_fitted_values(self, fitted_values: Dict):
+        if self.categories != "auto":
+            fitted_values = self.categories
+
+        self.fitted_values_ = fitted_values
 
         if self.handle_unknown == "use_encoded_value":
             for cat in self.fitted_values_:
@@ -318,8 +676,6 @@ class OrdinalEncoder:
                         f"encoding the categories."
                     )
 
-        return self
-
     def transform(self, df: DataFrame) -> DataFrame:
         """
         Transform input columns of df.
@@ -327,6 +683,24 @@ class OrdinalEncoder:
         :param df: Snowpark DataFrame to be transformed
         :return: A transformed Snowpark DataFrame
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
+        output_cols = self._check_output_columns()
+        self.output_cols = output_cols
+
+        ret_df = _transform_labels(self, df, output_cols)
+
+        return ret_df
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
+        output_cols = self._check_output_columns()
+        self.output_cols = output_cols
+        col_exprs = _generate_label_where(self, get_col)
+
+        return output_cols, col_exprs, []
+
+    def _check_output_columns(self) -> List:
         encode_cols = self.input_cols
         output_cols = self.output_cols
 
@@ -343,12 +717,7 @@ class OrdinalEncoder:
         else:
             output_cols = encode_cols
 
-        self.output_cols = output_cols
-        col_exprs = _generate_label_where(self)
-
-        ret_df = df.with_columns(output_cols, col_exprs)
-
-        return ret_df
+        return output_cols
 
     def fit_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -365,6 +734,9 @@ class OrdinalEncoder:
         :param df: A Snowpark DataFrame with transformed columns
         :return: A reversed Snowpark DataFrame
         """
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
+
         _check_fitted(self)
 
         # We assume that columns in the input
@@ -372,9 +744,7 @@ class OrdinalEncoder:
         # Verify that the df have the output columns
         _columns_in_dataframe(output_cols, df)
 
-        col_sql_expr = _generate_inverse_sql(self)
-
-        ret_df = df.with_columns(output_cols, col_sql_expr)
+        ret_df = _inverse_labels(self, df)
         return ret_df
 
     def get_udf_encoder(self) -> Dict:
@@ -386,20 +756,51 @@ class OrdinalEncoder:
         _check_fitted(self)
         if not self.output_cols:
             self.output_cols = self.input_cols
-        return _generate_udf_encoder(self)
+        udf_encoder = _generate_udf_encoder(self)
+        udf_encoder["infrequent"] = _infrequent_enabled(self)
+
+        return udf_encoder
+
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the OrdinalEncoder as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "OrdinalEncoder":
+        """
+        Load a OrdinalEncoder saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: OrdinalEncoder
+        """
+        return _load_transformer(cls, path, session)
 
 
 class LabelEncoder:
-    def __init__(self, input_col: str, output_col: str = None):
+    def __init__(self, input_col: str, output_col: str = None, strategy: str = "auto", join_threshold: int = 100):
         """
         A label indexer that maps a string column of labels to a column of label indices.
         The indices are in [0, number of labels].
 
         :param input_col: Column
         :param output_col:
+        :param strategy: 'case', 'join' or 'auto'. With 'case' each label is a branch in a CASE WHEN expression,
+                         with 'join' the labels are put in a mapping table that is joined with the DataFrame.
+                         'auto' uses 'join' if there are more labels than join_threshold
+        :param join_threshold: Number of labels above which a join is used when strategy is 'auto'
         """
+        _check_strategy(strategy)
+
         self.input_cols = input_col
         self.output_cols = output_col
+        self.strategy = strategy
+        self.join_threshold = join_threshold
 
     def fit(self, df: DataFrame):
         """
@@ -407,31 +808,64 @@ class LabelEncoder:
         :param df: DataFrame
         :return:
         """
+        if _is_local_df(df):
+            return _local_fit(self, df).fitted_values_
+
         # y = column_or_1d(y, warn=True)
         # self.classes_ = _unique(y)
         # check that y is existing in the df
         #
-        input_col = self.input_cols
-        self.fitted_values_ = _get_categories(df, "auto",[input_col])
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self.fitted_values_
+
+        obj_const_log = self._get_fit_exprs(df)
+        self._set_fitted_values(_collect_fitted_values(df, obj_const_log))
+        _save_fit_cache(self, df, cache_path)
 
         return self.fitted_values_
 
+    def _get_fit_exprs(self, df: DataFrame) -> List:
+        input_col = self.input_cols
+        if not isinstance(input_col, list):
+            input_col = [input_col]
+
+        return _get_categories_exprs("auto", input_col)
+
+    def _set_fitted_values(self, fitted_values: Dict):
+        self.fitted_values_ = fitted_values
+
     def transform(self, df: DataFrame):
+        if _is_local_df(df):
+            return _local_transform(self, df)
 
         _check_fitted(self)
 
+        output_cols = self._check_output_columns()
+        encoded_df = _transform_labels(self, df, output_cols)
+        return encoded_df
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
+        output_cols = self._check_output_columns()
+
+        col_exprs = _generate_label_where(self, get_col)
+        return output_cols, col_exprs, []
+
+    def _check_output_columns(self) -> List:
         input_col = self.input_cols
         output_col = self.output_cols
 
+        if isinstance(input_col, list):
+            input_col = input_col[0]
+        if isinstance(output_col, list):
+            output_col = output_col[0]
         if not output_col:
             output_col = input_col
         #
         self.input_cols = [input_col]
         self.output_cols = [output_col]
 
-        col_exprs = _generate_label_where(self)
-        encoded_df = df.with_columns([output_col], col_exprs)
-        return encoded_df
+        return self.output_cols
 
     def fit_transform(self, df: DataFrame):
         """
@@ -442,6 +876,9 @@ class LabelEncoder:
         return self.fit(df).transform(df)
 
     def inverse_transform(self, df: DataFrame):
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
+
         encoded_df = df
 
         _check_fitted(self)
@@ -451,9 +888,7 @@ class LabelEncoder:
         # Verify that the df have the output columns
         _columns_in_dataframe(output_cols, df)
 
-        col_sql_expr = _generate_inverse_sql(self)
-
-        ret_df = df.with_columns(output_cols, col_sql_expr)
+        ret_df = _inverse_labels(self, df)
 
         return ret_df
 
@@ -469,3 +904,163 @@ class LabelEncoder:
             self.output_cols = self.input_cols
 
         return _generate_udf_encoder(self)
+
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the LabelEncoder as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "LabelEncoder":
+        """
+        Load a LabelEncoder saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: LabelEncoder
+        """
+        return _load_transformer(cls, path, session)
+
+
+class HashingEncoder:
+    def __init__(
+            self,
+            *,
+            input_cols: Optional[Union[List[str], str]] = None,
+            output_cols: Optional[List[str]] = None,
+            n_features: int = 8,
+            drop_input_cols=True
+    ):
+        """
+        Encode categorical features by hashing them into a fixed number of columns.
+
+        Each value is hashed as '<input column>=<value>' using MD5_NUMBER_LOWER64 modulo n_features, and the column
+        for the bucket gets the number of input columns hashed into it. Since no categories are needed fit does not
+        scan the DataFrame, and unknown categories are encoded the same way as the ones seen before.
+        NULL values are not counted in any bucket. Numeric columns are hashed using their string representation.
+
+        :param input_cols: name of column or list of columns to encode
+        :param output_cols: list of n_features output columns, default is HASH_0, HASH_1, ...
+        :param n_features: Number of buckets, ie output columns
+        :param drop_input_cols: True/False if input columns should be dropped from the encoded DataFrame
+        """
+        if not isinstance(n_features, int) or n_features < 1:
+            raise ValueError(f"n_features {n_features} needs to be a Integer larger than 0")
+
+        self.input_cols = input_cols
+        self.output_cols = output_cols
+        self.n_features = n_features
+        self.drop_input_cols = drop_input_cols
+
+    def _check_output_columns(self) -> List:
+        output_cols = self.output_cols
+        if output_cols:
+            if not isinstance(output_cols, list):
+                output_cols = [output_cols]
+            if len(output_cols) != self.n_features:
+                raise ValueError(
+                    f"Need the same number of output columns as n_features. Have {len(output_cols)} output columns "
+                    f"and n_features is {self.n_features}"
+                )
+        else:
+            output_cols = [f"HASH_{idx}" for idx in range(self.n_features)]
+
+        return output_cols
+
+    def fit(self, df: DataFrame) -> object:
+        """
+        Fit the HashingEncoder, only the input columns are resolved since the buckets does not depend on the data.
+
+        :param df: Snowpark DataFrame, used to get the input columns if they are not set
+        :return: Fitted encoder
+        """
+        if _is_local_df(df):
+            # fit does not use the data once the input columns are set
+            _resolve_local_input_cols(self, df)
+
+        self.input_cols = _check_input_columns(df, self.input_cols)
+        self.output_cols = self._check_output_columns()
+        self.fitted_values_ = {"n_features": self.n_features}
+
+        return self
+
+    def transform(self, df: DataFrame) -> DataFrame:
+        """
+        Transform df by hashing the input columns into n_features columns.
+
+        If drop_input_cols is True then the input columns are dropped from the returned DataFrame.
+
+        :param df: Snowpark DataFrame to transform
+        :return: Encoded Snowpark DataFrame
+        """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
+        _check_fitted(self)
+
+        # The bucket of each input column is calculated once per row in its own column that the output columns use
+        n_features = F.lit(self.n_features)
+        bucket_cols = [f"{_BUCKET_COL_PREFIX}{idx}__" for idx in range(len(self.input_cols))]
+        bucket_exprs = [
+            F.call_builtin("MD5_NUMBER_LOWER64", F.concat(F.lit(col + '='), F.to_varchar(F.col(col)))) % n_features
+            for col in self.input_cols
+        ]
+        df_buckets = _with_columns(df, bucket_cols, bucket_exprs)
+
+        col_exprs = []
+        for idx in range(self.n_features):
+            count_expr = None
+            for bucket_col in bucket_cols:
+                is_bucket = F.iff(F.col(bucket_col) == F.lit(idx), F.lit(1), F.lit(0))
+                count_expr = is_bucket if count_expr is None else count_expr + is_bucket
+            col_exprs.append(count_expr)
+
+        drop_cols = bucket_cols + (self.input_cols if self.drop_input_cols else [])
+
+        return _with_columns(df_buckets, self.output_cols, col_exprs, drop_cols)
+
+    def fit_transform(self, df: DataFrame) -> DataFrame:
+        """
+        Fit HashingEncoder to df and transform the df.
+
+        :param df: Snowpark DataFrame to encode
+        :return: Encoded Snowpark DataFrame
+        """
+        return self.fit(df).transform(df)
+
+    def get_udf_encoder(self) -> Dict:
+        """
+        Returns the encoder as a dictionary object to be used with the udf_transform functions.
+
+        :return: Dictionary containing fitted values
+        """
+        _check_fitted(self)
+
+        return {"encoder": type(self).__name__, "nbr_features": len(self.input_cols),
+                "input_features": self.input_cols, "output_cols": self.output_cols,
+                "fitted_values": self.fitted_values_, "drop_input_cols": self.drop_input_cols}
+
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the HashingEncoder as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "HashingEncoder":
+        """
+        Load a HashingEncoder saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: HashingEncoder
+        """
+        return _load_transformer(cls, path, session)
+
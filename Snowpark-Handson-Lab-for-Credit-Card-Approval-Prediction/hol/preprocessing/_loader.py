@@ -0,0 +1,125 @@
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from snowflake.snowpark import DataFrame
+from snowflake.snowpark import types as T
+
+from ._utilities import _get_columns, _get_schema, _normalize_col_name
+
+__all__ = [
+    "load_training_data",
+    "iter_training_batches",
+]
+
+_INTEGER_TYPES = (T.LongType, T.IntegerType, T.ShortType, T.ByteType)
+
+
+def _prepare_columns(df: DataFrame, feature_cols: Optional[List[str]], target_col: Optional[str]):
+    # Only the needed columns are fetched, all columns but the target are features if not provided
+    if feature_cols is None:
+        target = _normalize_col_name(target_col) if target_col else None
+        feature_cols = [col for col in _get_columns(df) if _normalize_col_name(col) != target]
+    if len(feature_cols) == 0:
+        raise ValueError("No feature columns to load")
+
+    select_cols = list(feature_cols) + ([target_col] if target_col else [])
+    df = df.select(select_cols)
+
+    # Columns as named in the pandas DataFrames returned by to_pandas_batches
+    pandas_features = [_normalize_col_name(col) for col in feature_cols]
+    pandas_target = _normalize_col_name(target_col) if target_col else None
+
+    return df, pandas_features, pandas_target
+
+
+def _get_target_dtype(df: DataFrame, target_col: str, dtype):
+    # Integer targets, ie class labels, are kept as integers, other targets use the same dtype as the features
+    datatype = next(field.datatype for field in _get_schema(df).fields
+                    if _normalize_col_name(field.name) == _normalize_col_name(target_col))
+    if isinstance(datatype, _INTEGER_TYPES) or (isinstance(datatype, T.DecimalType) and datatype.scale == 0):
+        return np.int64
+    return dtype
+
+
+def load_training_data(df: DataFrame, feature_cols: Optional[List[str]] = None, target_col: Optional[str] = None,
+                       dtype=np.float32) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Load a Snowpark DataFrame into NumPy arrays without creating a pandas DataFrame of the whole table.
+
+    The rows are streamed with to_pandas_batches into arrays allocated once, so the peak memory is the arrays plus one
+    batch. With the default float32 the features use half the memory of to_pandas.
+
+    :param df: Snowpark DataFrame to load, ie session.table(training_table)
+    :param feature_cols: Columns to load as features, if not provided all columns except target_col are used
+    :param target_col: Optional column to load as target
+    :param dtype: NumPy dtype of the features
+    :return: Tuple with the features as an array of shape (rows, features) and the target, None if no target_col
+    """
+    df, features, target = _prepare_columns(df, feature_cols, target_col)
+
+    nbr_rows = df.count()
+    X = np.empty((nbr_rows, len(features)), dtype=dtype)
+    y = np.empty(nbr_rows, dtype=_get_target_dtype(df, target_col, dtype)) if target else None
+
+    pos = 0
+    for batch in df.to_pandas_batches():
+        end = pos + len(batch)
+        if end > nbr_rows:
+            raise ValueError("The DataFrame returned more rows than counted, it can not change while loading")
+        X[pos:end] = batch[features].to_numpy(dtype=dtype)
+        if target:
+            y[pos:end] = batch[target].to_numpy(dtype=y.dtype)
+        pos = end
+
+    # Fewer rows than counted can only happen if the data changed, return what was loaded
+    if pos < nbr_rows:
+        X = X[:pos]
+        y = y[:pos] if target else None
+
+    return X, y
+
+
+def iter_training_batches(df: DataFrame, feature_cols: Optional[List[str]] = None, target_col: Optional[str] = None,
+                          batch_size: Optional[int] = None,
+                          dtype=np.float32) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """
+    Iterate over a Snowpark DataFrame as mini-batches of NumPy arrays, ie for models with partial_fit.
+
+    Only one batch from to_pandas_batches is kept in memory at a time.
+
+    :param df: Snowpark DataFrame to load, ie session.table(training_table)
+    :param feature_cols: Columns to load as features, if not provided all columns except target_col are used
+    :param target_col: Optional column to load as target
+    :param batch_size: Number of rows per mini-batch, the last one can be smaller. If not provided the batches are
+                       returned with the size fetched from Snowflake
+    :param dtype: NumPy dtype of the features
+    :return: Iterator of tuples with the features and the target, None if no target_col
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size needs to be at least 1")
+
+    df, features, target = _prepare_columns(df, feature_cols, target_col)
+    target_dtype = _get_target_dtype(df, target_col, dtype) if target else None
+
+    # Rows left over from the previous batch fetched from Snowflake
+    rest = None
+    for batch in df.to_pandas_batches():
+        if rest is not None:
+            batch = pd.concat([rest, batch], ignore_index=True)
+            rest = None
+        if batch_size is None:
+            chunks = [batch]
+        else:
+            nbr_full = len(batch) // batch_size * batch_size
+            chunks = [batch.iloc[i:i + batch_size] for i in range(0, nbr_full, batch_size)]
+            if nbr_full < len(batch):
+                rest = batch.iloc[nbr_full:]
+
+        for chunk in chunks:
+            yield chunk[features].to_numpy(dtype=dtype), \
+                chunk[target].to_numpy(dtype=target_dtype) if target else None
+
+    if rest is not None:
+        yield rest[features].to_numpy(dtype=dtype), rest[target].to_numpy(dtype=target_dtype) if target else None
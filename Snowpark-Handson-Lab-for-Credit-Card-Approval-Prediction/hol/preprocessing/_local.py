@@ -0,0 +1,217 @@
+from typing import Dict, List
+import json
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from ._udf import UdfTransformPlan, _as_list, _to_varchar
+
+_CATEGORY_ENCODERS = ("OneHotEncoder", "OrdinalEncoder", "LabelEncoder")
+
+
+def _get_min_max_values(col_min, col_max, feature_range) -> Dict:
+    # Fitted values of MinMaxScaler. A constant column gets scale 1 as in scikit-learn, a column without values has
+    # no min and max and is kept as is
+    if col_min is None or col_max is None:
+        return {"max": None, "min": None, "range": 0, "scale": 1, "min_": 0}
+
+    col_range = col_max - col_min
+    col_scale = (feature_range[1] - feature_range[0]) / (col_range if col_range != 0 else 1)
+
+    return {"max": col_max, "min": col_min, "range": col_range, "scale": col_scale,
+            "min_": feature_range[0] - col_min * col_scale}
+
+
+def _is_local_df(df) -> bool:
+    # pandas and Polars DataFrames are handled by the local backend, anything else is a Snowpark DataFrame
+    return isinstance(df, pd.DataFrame) or type(df).__module__.split(".")[0] == "polars"
+
+
+def _to_pandas(df) -> pd.DataFrame:
+    if isinstance(df, pd.DataFrame):
+        return df
+    return df.to_pandas()
+
+
+def _from_pandas(pdf: pd.DataFrame, like):
+    # Return the same kind of DataFrame as the one given to the transformer
+    if isinstance(like, pd.DataFrame):
+        return pdf
+    import polars as pl
+    return pl.from_pandas(pdf)
+
+
+def _resolve_local_input_cols(transformer, df):
+    # Same defaults as the Snowpark backend, all numeric columns for scalers and all columns for encoders
+    if transformer.input_cols:
+        return
+    pdf = _to_pandas(df)
+    if type(transformer).__name__ in _CATEGORY_ENCODERS + ("HashingEncoder",):
+        transformer.input_cols = list(pdf.columns)
+    else:
+        numeric_cols = list(pdf.select_dtypes(include="number").columns)
+        if len(numeric_cols) == 0:
+            raise ValueError("No numeric columns in the provided DataFrame")
+        transformer.input_cols = numeric_cols
+
+
+def _get_categories(values: pd.Series) -> List[str]:
+    # Same as ARRAY_AGG(DISTINCT TO_VARCHAR(col)) WITHIN GROUP (ORDER BY TO_VARCHAR(col))
+    return sorted(_to_varchar(values).dropna().unique().tolist())
+
+
+def _get_frequent_categories(values: pd.Series, max_categories, min_frequency) -> List[str]:
+    freq = _to_varchar(values).dropna().value_counts()
+    if min_frequency is not None:
+        min_freq = min_frequency * freq.sum() if isinstance(min_frequency, float) else min_frequency
+        freq = freq[freq >= min_freq]
+    if max_categories is not None:
+        # Most frequent first, ties ordered by category as the ROW_NUMBER window
+        freq = freq.reset_index().set_axis(["cat", "freq"], axis=1)
+        freq = freq.sort_values(["freq", "cat"], ascending=[False, True]).head(max_categories)
+        return sorted(freq["cat"].tolist())
+
+    return sorted(freq.index.tolist())
+
+
+def _get_local_fit_values(transformer, pdf: pd.DataFrame, frequency_mode: bool) -> Dict:
+    # The statistics have the same shape as the ones returned by the object_construct of _get_fit_exprs
+    name = type(transformer).__name__
+    input_cols = _as_list(transformer.input_cols)
+    fitted_values = {}
+
+    for col in input_cols:
+        values = pdf[col]
+        if name in _CATEGORY_ENCODERS:
+            if frequency_mode:
+                fitted_values[col] = _get_frequent_categories(values, transformer.max_categories,
+                                                              transformer.min_frequency)
+            else:
+                fitted_values[col] = _get_categories(values)
+            continue
+
+        values = values.astype(np.float64)
+        if name == "MinMaxScaler":
+            non_null = values.dropna()
+            fitted_values[col] = _get_min_max_values(non_null.min() if len(non_null) else None,
+                                                     non_null.max() if len(non_null) else None,
+                                                     transformer.feature_range)
+        elif name == "StandardScaler":
+            # NULL in Snowflake, AVG needs one value and STDDEV two
+            count = int(values.count())
+            fitted_values[col] = {"mean": values.mean() if count else None,
+                                  "scale": values.std(ddof=1) if count > 1 else None, "count": count,
+                                  "var_pop": values.var(ddof=0) if count else None}
+        elif name == "MaxAbsScaler":
+            max_abs = abs(values.max())
+            fitted_values[col] = {"max_abs": max_abs, "scale": max_abs if max_abs > 10 * 2 ** -52 else 1}
+        elif name == "RobustScaler":
+            # Exact quantiles, approx and sample_fraction are only used to reduce the cost of the SQL aggregations
+            q_min, q_max = transformer.quantile_range
+            center = values.median() if transformer.with_centering else 0
+            scale = 1
+            if transformer.with_scaling:
+                scale = values.quantile(q_max / 100) - values.quantile(q_min / 100)
+                if transformer.unit_variance:
+                    scale = scale / (stats.norm.ppf(q_max / 100.0) - stats.norm.ppf(q_min / 100.0))
+            fitted_values[col] = {"center": center, "scale": scale}
+            if transformer.approx or transformer.sample_fraction is not None:
+                fitted_values[col]["nbr_rows"] = int(values.count())
+
+    # Python numbers, so the fitted values can be saved as JSON
+    for col, col_values in fitted_values.items():
+        if isinstance(col_values, dict):
+            fitted_values[col] = {k: v.item() if isinstance(v, np.generic) else v for k, v in col_values.items()}
+
+    return fitted_values
+
+
+def _collect_local_fitted_values(transformer, df) -> Dict:
+    """
+    Calculate the statistics of transformer on a pandas or Polars DataFrame, returned the same way as
+    _collect_fitted_values returns the ones calculated by Snowflake.
+    """
+    pdf = _to_pandas(df)
+    _resolve_local_input_cols(transformer, pdf)
+
+    # Validates the parameters and sets the input columns, the returned expressions are not used
+    fit_exprs = transformer._get_fit_exprs(pdf)
+
+    return _get_local_fit_values(transformer, pdf, fit_exprs is None)
+
+
+def _local_fit(transformer, df):
+    """
+    Fit transformer on a pandas or Polars DataFrame, the statistics are calculated with pandas and then set the same
+    way as the ones calculated by Snowflake.
+    """
+    transformer._set_fitted_values(_collect_local_fitted_values(transformer, df))
+
+    return transformer
+
+
+def _local_transform(transformer, df):
+    pdf = _to_pandas(df)
+
+    return _from_pandas(UdfTransformPlan(transformer.get_udf_encoder()).transform(pdf), df)
+
+
+def _inverse_categories(categories: List, idx: np.ndarray) -> np.ndarray:
+    # Category for each index, None for unknown, infrequent and missing
+    categories = np.asarray(list(categories) + [None], dtype=object)
+    idx = np.where((idx >= 0) & (idx < len(categories) - 1), idx, len(categories) - 1)
+
+    return categories[idx]
+
+
+def _local_inverse_transform(transformer, df):
+    name = type(transformer).__name__
+    pdf = _to_pandas(df).copy()
+    fitted_values = transformer.fitted_values_
+
+    if name in ("MinMaxScaler", "StandardScaler", "MaxAbsScaler", "RobustScaler"):
+        output_cols = _as_list(transformer.output_cols) or transformer.input_cols
+        for in_col, out_col in zip(transformer.input_cols, output_cols):
+            values = pdf[out_col].astype(np.float64)
+            col_values = fitted_values[in_col]
+            if name == "MinMaxScaler":
+                pdf[out_col] = (values - col_values["min_"]) / col_values["scale"]
+            elif name == "StandardScaler":
+                pdf[out_col] = values * col_values["scale"] + col_values["mean"]
+            elif name == "MaxAbsScaler":
+                pdf[out_col] = values * col_values["scale"]
+            else:
+                pdf[out_col] = values * col_values["scale"] + col_values["center"]
+    elif name == "OneHotEncoder":
+        suffix = transformer._get_extra_suffix()
+        drop_cols = []
+        if transformer.output == "sparse":
+            indices = [json.loads(row) if isinstance(row, str) else _as_list(row)
+                       for row in pdf[transformer.sparse_col]]
+            drop_cols.append(transformer.sparse_col)
+        offset = 0
+        for col in transformer.input_cols:
+            categories = fitted_values[col]
+            if transformer.output == "sparse":
+                idx = np.array([next((i - offset for i in row if offset <= i < offset + len(categories)), -1)
+                                for row in indices], dtype=np.int64)
+                offset += len(categories) + (1 if suffix else 0)
+            else:
+                col_names = transformer.output_cols[col]
+                encoded = pdf[col_names].to_numpy()
+                idx = np.where(encoded.any(axis=1), encoded.argmax(axis=1), -1) if len(col_names) \
+                    else np.full(len(pdf), -1)
+                drop_cols.extend(col_names)
+                if suffix:
+                    drop_cols.append(col + suffix)
+            pdf[col] = _inverse_categories(categories, idx)
+        pdf = pdf.drop(columns=drop_cols)
+    elif name in ("OrdinalEncoder", "LabelEncoder"):
+        for in_col, out_col in zip(_as_list(transformer.input_cols), _as_list(transformer.output_cols)):
+            idx = pdf[out_col].fillna(-1).to_numpy(dtype=np.int64)
+            pdf[out_col] = _inverse_categories(fitted_values[in_col], idx)
+    else:
+        raise ValueError(f"{name} does not support inverse_transform")
+
+    return _from_pandas(pdf, df)
@@ -0,0 +1,189 @@
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from snowflake.snowpark import DataFrame, Session
+
+from ._utilities import _normalize_col_name, _SCHEMA_CACHE
+
+__all__ = [
+    "set_fit_cache",
+]
+
+# Local directory or stage path where fitted transformers are cached, None if the cache is disabled
+_FIT_CACHE = {"location": None}
+
+
+def set_fit_cache(location: Optional[str]):
+    """
+    Enable caching of fitted values for transformers fitted on tables.
+
+    When enabled, fit first looks for a transformer of the same class, with the same parameters and fitted on the same
+    table with the same row count and last altered time. If found the fitted values are loaded instead of scanning
+    the table. Only DataFrames created with session.table are cached, other DataFrames are always fitted. The row
+    count and last altered time are queried once per fit, or once for all transformers fitted with fit_all.
+
+    :param location: Local directory or stage path, starting with @, used for the cache. None disables the cache
+    """
+    _FIT_CACHE["location"] = location
+
+
+def _get_state(obj) -> Dict:
+    return {"transformer": type(obj).__name__, "state": vars(obj)}
+
+
+def _set_state(obj, state: Dict):
+    if state["transformer"] != type(obj).__name__:
+        raise ValueError(f"Can not load a {state['transformer']} into a {type(obj).__name__}")
+
+    obj.__dict__.update(state["state"])
+
+
+def _split_stage_path(path: str) -> Tuple[str, str]:
+    # "@stage/dir/file.json" -> ("@stage/dir", "file.json")
+    if "/" not in path or path.endswith("/"):
+        raise ValueError(f"{path} needs to include a file name, ie @stage/transformer.json")
+
+    stage_dir, file_name = path.rsplit("/", 1)
+    return stage_dir, file_name
+
+
+def _write_json(data: Dict, path: str, session: Optional[Session] = None):
+    if not path.startswith("@"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(data, f)
+        return
+
+    if session is None:
+        raise ValueError("A session is needed to save to a stage")
+
+    stage_dir, file_name = _split_stage_path(path)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        local_file = os.path.join(tmp_dir, file_name)
+        with open(local_file, "w") as f:
+            json.dump(data, f)
+        session.file.put(local_file, stage_dir, auto_compress=False, overwrite=True)
+
+
+def _read_json(path: str, session: Optional[Session] = None) -> Optional[Dict]:
+    # Returns None if the file does not exist
+    if not path.startswith("@"):
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    if session is None:
+        raise ValueError("A session is needed to load from a stage")
+
+    _, file_name = _split_stage_path(path)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not session.file.get(path, tmp_dir):
+            return None
+        with open(os.path.join(tmp_dir, file_name), "r") as f:
+            return json.load(f)
+
+
+def _save_transformer(obj, path: str, session: Optional[Session] = None):
+    _write_json(_get_state(obj), path, session)
+
+
+def _load_transformer(cls, path: str, session: Optional[Session] = None):
+    state = _read_json(path, session)
+    if state is None:
+        raise FileNotFoundError(f"Can not find {path}")
+
+    # The parameters are part of the saved state, so __init__ is not called
+    obj = cls.__new__(cls)
+    _set_state(obj, state)
+
+    return obj
+
+
+def _query_table_fingerprint(df: DataFrame) -> Optional[Dict]:
+    # Only tables has metadata that tells if the data has changed
+    table_name = getattr(df, "table_name", None)
+    if not table_name:
+        return None
+
+    session = df.session
+    name_parts = [_normalize_col_name(part) for part in re.findall(r'"(?:[^"]|"")*"|[^.]+', table_name)]
+    if len(name_parts) == 1:
+        name_parts.insert(0, _normalize_col_name(session.get_current_schema() or ""))
+    if len(name_parts) == 2:
+        name_parts.insert(0, _normalize_col_name(session.get_current_database() or ""))
+    database, schema, table = name_parts
+
+    database_ident = '"' + database.replace('"', '""') + '"'
+    rows = session.sql(
+        f"SELECT ROW_COUNT, LAST_ALTERED FROM {database_ident}.INFORMATION_SCHEMA.TABLES "
+        f"WHERE TABLE_SCHEMA = ? AND TABLE_NAME = ?", params=[schema, table]
+    ).collect()
+    # Views has no row count
+    if not rows or rows[0][0] is None:
+        return None
+
+    return {"table": f"{database}.{schema}.{table}", "row_count": rows[0][0], "last_altered": str(rows[0][1])}
+
+
+def _get_table_fingerprint(df: DataFrame) -> Optional[Dict]:
+    cached = _SCHEMA_CACHE.get(df, {})
+    if "fingerprint" in cached:
+        return cached["fingerprint"]
+
+    return _query_table_fingerprint(df)
+
+
+@contextmanager
+def _shared_fingerprint(df: DataFrame):
+    # Transformers fitted together on df use the same fingerprint, so the table metadata is only queried once. It is
+    # removed afterwards, so a later fit on the same DataFrame sees changes to the table
+    if _FIT_CACHE["location"] is None:
+        yield
+        return
+
+    cached = _SCHEMA_CACHE.setdefault(df, {})
+    cached["fingerprint"] = _query_table_fingerprint(df)
+    try:
+        yield
+    finally:
+        cached.pop("fingerprint", None)
+
+
+def _get_fit_cache_path(obj, df: DataFrame) -> Optional[str]:
+    # Returns None if the cache is disabled or df is not a table. Needs to be called before fit changes the parameters
+    location = _FIT_CACHE["location"]
+    if location is None:
+        return None
+
+    fingerprint = _get_table_fingerprint(df)
+    if fingerprint is None:
+        return None
+
+    params = {k: v for k, v in vars(obj).items() if not k.endswith("_")}
+    key = json.dumps({"transformer": type(obj).__name__, "params": params, "table": fingerprint},
+                     sort_keys=True, default=str)
+
+    return location.rstrip("/") + "/" + hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+
+
+def _load_fit_cache(obj, df: DataFrame, cache_path: Optional[str]) -> bool:
+    if cache_path is None:
+        return False
+
+    state = _read_json(cache_path, df.session)
+    if state is None:
+        return False
+
+    _set_state(obj, state)
+    return True
+
+
+def _save_fit_cache(obj, df: DataFrame, cache_path: Optional[str]):
+    if cache_path is not None:
+        _save_transformer(obj, cache_path, df.session)
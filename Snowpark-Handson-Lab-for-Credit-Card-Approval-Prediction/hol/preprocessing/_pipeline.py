@@ -0,0 +1,249 @@
+from typing import List, Dict, Optional
+
+from snowflake.snowpark import DataFrame, Session
+import snowflake.snowpark.functions as F
+
+from ._utilities import _check_fitted, _collect_fitted_values, _normalize_col_name, _get_columns, _seed_columns
+from ._local import _is_local_df
+from ._persistence import _get_state, _set_state, _write_json, _read_json, _get_fit_cache_path, _load_fit_cache, \
+    _save_fit_cache, _shared_fingerprint
+from ._scalers import MinMaxScaler, StandardScaler, MaxAbsScaler, RobustScaler, Normalizer, Binarizer
+from ._encoders import _use_join, OneHotEncoder, OrdinalEncoder, LabelEncoder, HashingEncoder
+
+__all__ = [
+    "fit_all",
+    "Pipeline",
+]
+
+_TRANSFORMERS = {cls.__name__: cls for cls in [MinMaxScaler, StandardScaler, MaxAbsScaler, RobustScaler, Normalizer,
+                                               Binarizer, OneHotEncoder, OrdinalEncoder, LabelEncoder, HashingEncoder]}
+
+
+def fit_all(transformers: List, df: DataFrame) -> List:
+    """
+    Fit several transformers on the same DataFrame using one single query.
+
+    The aggregations needed by each transformer are combined into one object_construct so df is only scanned once,
+    the result is then split back into the fitted values of each transformer. Transformers found in the fit cache,
+    see set_fit_cache, are not part of the query, and the table metadata used by the cache is queried once.
+
+    :param transformers: List of scalers and/or encoders to fit
+    :param df: Snowpark DataFrame used for fitting all the transformers
+    :return: List of fitted transformers
+    """
+    if _is_local_df(df):
+        for transformer in transformers:
+            transformer.fit(df)
+        return transformers
+
+    with _shared_fingerprint(df):
+        obj_const_log = []
+        agg_transformers = []
+        for idx, transformer in enumerate(transformers):
+            if not hasattr(transformer, "_get_fit_exprs"):
+                # Transformers that does not need any statistics, ie Normalizer and Binarizer
+                transformer.fit(df)
+                continue
+
+            cache_path = _get_fit_cache_path(transformer, df)
+            if _load_fit_cache(transformer, df, cache_path):
+                continue
+
+            fit_exprs = transformer._get_fit_exprs(df)
+            if fit_exprs is None:
+                # Transformers that needs their own query, ie encoders limiting the categories by frequency
+                transformer.fit(df)
+                continue
+
+            agg_transformers.append((str(idx), transformer, cache_path))
+            if fit_exprs:
+                obj_const_log.extend([F.lit(str(idx)), F.object_construct(*fit_exprs)])
+
+        fitted_values = _collect_fitted_values(df, obj_const_log)
+
+        for key, transformer, cache_path in agg_transformers:
+            transformer._set_fitted_values(fitted_values.get(key, {}))
+            _save_fit_cache(transformer, df, cache_path)
+
+    return transformers
+
+
+def _is_fusable(step) -> bool:
+    # Steps that joins with mapping tables can not be expressed as column expressions
+    if not hasattr(step, "_get_transform_exprs"):
+        return False
+    if hasattr(step, "strategy"):
+        return not _use_join(step)
+
+    return True
+
+
+def _get_step_cols(cols) -> Optional[set]:
+    # Normalized names of the input or output columns of a step, None if they are not known before fitting.
+    # OneHotEncoder has a dict with the output columns of each input column
+    if not cols:
+        return None
+    if isinstance(cols, str):
+        cols = [cols]
+    elif isinstance(cols, dict):
+        cols = [col for value in cols.values() for col in ([value] if isinstance(value, str) else value)]
+
+    return set([_normalize_col_name(col) for col in cols])
+
+
+class Pipeline:
+    def __init__(self, steps: List):
+        """
+        Chain transformers so they are fitted with as few scans as possible and transformed using one projection.
+
+        The column expressions of each step are built on top of the expressions of the previous steps, so transform
+        generates one flat select over the source DataFrame instead of one nested projection per column and step.
+
+        :param steps: List of scalers and/or encoders, applied in the order given
+        """
+        self.steps = steps
+
+    def fit(self, df: DataFrame):
+        """
+        Fit all steps of the pipeline.
+
+        Steps that only use columns of df that has not been changed by a previous step are fitted together using
+        fit_all, other steps are fitted on the projection of the already fitted steps.
+
+        :param df: Snowpark DataFrame used for fitting
+        :return: fitted pipeline
+        """
+        if _is_local_df(df):
+            for step in self.steps:
+                step.fit(df)
+                df = step.transform(df)
+            return self
+
+        source_cols = set([_normalize_col_name(col) for col in _get_columns(df)])
+        fitted_steps = []
+        batch = []
+        batch_cols = set()
+        for step in self.steps:
+            step_cols = _get_step_cols(step.input_cols)
+
+            # A step can only be fitted together with the current batch if it uses unchanged columns of df. The batch
+            # is closed after a step without input_cols, since the columns it changes are only known once fitted
+            if batch and (step_cols is None or batch_cols is None or not step_cols <= source_cols
+                          or step_cols & batch_cols):
+                fit_all(batch, self._transform_steps(df, fitted_steps))
+                fitted_steps.extend(batch)
+                batch = []
+                batch_cols = set()
+
+            batch.append(step)
+            if step_cols is None:
+                batch_cols = None
+            else:
+                batch_cols |= step_cols | (_get_step_cols(step.output_cols) or set())
+
+        if batch:
+            fit_all(batch, self._transform_steps(df, fitted_steps))
+
+        return self
+
+    def transform(self, df: DataFrame) -> DataFrame:
+        """
+        Transform df using all steps of the pipeline as one projection.
+
+        :param df: Snowpark DataFrame to transform
+        :return: Transformed Snowpark DataFrame
+        """
+        for step in self.steps:
+            _check_fitted(step)
+
+        if _is_local_df(df):
+            for step in self.steps:
+                df = step.transform(df)
+            return df
+
+        return self._transform_steps(df, self.steps)
+
+    def fit_transform(self, df: DataFrame) -> DataFrame:
+        """
+        Fit all steps of the pipeline and then transform df.
+
+        :param df: Snowpark DataFrame used for fitting and then transformed
+        :return: Transformed Snowpark DataFrame
+        """
+        return self.fit(df).transform(df)
+
+    def explain(self, df: DataFrame) -> Dict:
+        """
+        Returns the SQL generated by transform together with its size.
+
+        :param df: Snowpark DataFrame to transform
+        :return: Dictionary with the SQL, the length of the SQL and the number of steps
+        """
+        sql = self.transform(df).queries["queries"][-1]
+
+        return {"nbr_steps": len(self.steps), "sql_length": len(sql), "sql": sql}
+
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of all steps as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _write_json({"transformer": type(self).__name__, "steps": [_get_state(step) for step in self.steps]},
+                    path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "Pipeline":
+        """
+        Load a Pipeline saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: Pipeline
+        """
+        state = _read_json(path, session)
+        if state is None:
+            raise FileNotFoundError(f"Can not find {path}")
+
+        steps = []
+        for step_state in state["steps"]:
+            step_cls = _TRANSFORMERS[step_state["transformer"]]
+            step = step_cls.__new__(step_cls)
+            _set_state(step, step_state)
+            steps.append(step)
+
+        return cls(steps)
+
+    @staticmethod
+    def _select_columns(df: DataFrame, columns: Dict) -> DataFrame:
+        # The names of the selected columns are known, so no describe query is needed for the result
+        ret_df = df.select([expr.as_(name) for name, expr in columns.values()])
+
+        return _seed_columns(ret_df, [name for name, _ in columns.values()])
+
+    @staticmethod
+    def _transform_steps(df: DataFrame, steps: List) -> DataFrame:
+        if not steps:
+            return df
+
+        # {"NORMALIZED_NAME": (name, expression)} in the order of the output columns
+        columns = {_normalize_col_name(col): (col, F.col(col)) for col in _get_columns(df)}
+
+        def get_col(name):
+            return columns.get(_normalize_col_name(name), (name, F.col(name)))[1]
+
+        for step in steps:
+            if not _is_fusable(step):
+                # Step can not be fused, apply the columns so far and continue on the result
+                df = step.transform(Pipeline._select_columns(df, columns))
+                columns = {_normalize_col_name(col): (col, F.col(col)) for col in _get_columns(df)}
+                continue
+
+            output_cols, col_exprs, drop_cols = step._get_transform_exprs(get_col)
+            for name, expr in zip(output_cols, col_exprs):
+                columns[_normalize_col_name(name)] = (name, expr)
+            for name in drop_cols:
+                columns.pop(_normalize_col_name(name), None)
+
+        return Pipeline._select_columns(df, columns)
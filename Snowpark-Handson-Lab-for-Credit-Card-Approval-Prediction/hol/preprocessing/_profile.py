@@ -0,0 +1,92 @@
+from typing import List, Optional, Union
+
+import pandas as pd
+
+import snowflake.snowpark.functions as F
+from snowflake.snowpark import DataFrame
+from snowflake.snowpark import types as T
+
+from ._local import _is_local_df, _to_pandas
+from ._utilities import _get_schema, _normalize_col_name
+
+__all__ = [
+    "profile",
+]
+
+# Types that AVG can be calculated on
+_NUMERIC_TYPES = (T.ByteType, T.ShortType, T.IntegerType, T.LongType, T.FloatType, T.DoubleType, T.DecimalType)
+_PROFILE_COLS = ["COLUMN_NAME", "DATA_TYPE", "NULL_COUNT", "DISTINCT_COUNT", "MIN", "MAX", "MEAN", "IS_CONSTANT"]
+
+
+def _is_constant(null_count: int, nbr_rows: int, min_value, max_value) -> bool:
+    # A column is constant if all values that are not null are the same, or all values are null
+    if null_count == nbr_rows:
+        return True
+    return bool(min_value == max_value)
+
+
+def _profile_local(pdf: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+    rows = []
+    for col in columns or list(pdf.columns):
+        values = pdf[col]
+        numeric = pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+        non_null = values.dropna()
+        min_value = non_null.min() if len(non_null) else None
+        max_value = non_null.max() if len(non_null) else None
+        null_count = int(values.isna().sum())
+        rows.append([col, str(values.dtype), null_count, int(values.nunique()), min_value, max_value,
+                     float(non_null.mean()) if numeric and len(non_null) else None,
+                     _is_constant(null_count, len(pdf), min_value, max_value)])
+
+    return pd.DataFrame(rows, columns=_PROFILE_COLS)
+
+
+def profile(df: Union[DataFrame, pd.DataFrame], columns: Optional[List[str]] = None,
+            exact: bool = False) -> pd.DataFrame:
+    """
+    Profile the columns of a DataFrame with one aggregate query.
+
+    For each column the number of nulls, the number of distinct values, min, max, mean for numeric columns and if the
+    column is constant are calculated. All statistics are calculated in the same aggregation, so the table is scanned
+    once regardless of the number of columns.
+
+    :param df: Snowpark DataFrame to profile, a pandas or Polars DataFrame is profiled locally with exact counts
+    :param columns: Columns to profile, default is all columns
+    :param exact: If True distinct values are counted with COUNT(DISTINCT), otherwise APPROX_COUNT_DISTINCT is used
+    :return: pandas DataFrame with one row per column and the columns COLUMN_NAME, DATA_TYPE, NULL_COUNT,
+             DISTINCT_COUNT, MIN, MAX, MEAN and IS_CONSTANT
+    """
+    if _is_local_df(df):
+        return _profile_local(_to_pandas(df), columns)
+
+    fields = _get_schema(df).fields
+    if columns:
+        needed_cols = [_normalize_col_name(col) for col in columns]
+        fields_by_name = {_normalize_col_name(field.name): field for field in fields}
+        missing_cols = [col for col in needed_cols if col not in fields_by_name]
+        if missing_cols:
+            raise ValueError(f"Cannot find columns {missing_cols} in the input dataframe")
+        fields = [fields_by_name[col] for col in needed_cols]
+
+    count_distinct = F.count_distinct if exact else F.approx_count_distinct
+    agg_exprs = [F.count(F.lit(1)).as_("NBR_ROWS")]
+    for idx, field in enumerate(fields):
+        col = F.col(field.name)
+        agg_exprs.extend([F.count(col).as_(f"NOT_NULL_{idx}"), count_distinct(col).as_(f"DISTINCT_{idx}"),
+                          F.min(col).as_(f"MIN_{idx}"), F.max(col).as_(f"MAX_{idx}")])
+        if isinstance(field.datatype, _NUMERIC_TYPES):
+            agg_exprs.append(F.avg(col).as_(f"MEAN_{idx}"))
+
+    stats = df.agg(agg_exprs).collect()[0].as_dict()
+
+    nbr_rows = int(stats["NBR_ROWS"])
+    rows = []
+    for idx, field in enumerate(fields):
+        null_count = nbr_rows - int(stats[f"NOT_NULL_{idx}"])
+        min_value, max_value = stats[f"MIN_{idx}"], stats[f"MAX_{idx}"]
+        mean = stats.get(f"MEAN_{idx}")
+        rows.append([field.name, field.datatype.simple_string(), null_count, int(stats[f"DISTINCT_{idx}"]),
+                     min_value, max_value, float(mean) if mean is not None else None,
+                     _is_constant(null_count, nbr_rows, min_value, max_value)])
+
+    return pd.DataFrame(rows, columns=_PROFILE_COLS)
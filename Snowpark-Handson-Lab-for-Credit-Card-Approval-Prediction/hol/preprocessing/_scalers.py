@@ -1,13 +1,17 @@
 from typing import Tuple, Union, List, Optional, Dict
 
-from snowflake.snowpark import DataFrame
+from snowflake.snowpark import DataFrame, Session
 import snowflake.snowpark.functions as F
 from snowflake.snowpark import types as T
 
-import json
 from scipy import stats
 
-from ._utilities import _check_fitted, _generate_udf_encoder, _columns_in_dataframe
+from ._utilities import _check_fitted, _generate_udf_encoder, _columns_in_dataframe, _collect_fitted_values, \
+    _get_schema, _with_columns, _get_columns
+from ._local import _is_local_df, _resolve_local_input_cols, _local_fit, _local_transform, _local_inverse_transform, \
+    _get_min_max_values, _collect_local_fitted_values
+from ._persistence import _save_transformer, _load_transformer, _get_fit_cache_path, _load_fit_cache, \
+    _save_fit_cache
 
 __all__ = [
     "MinMaxScaler",
@@ -18,9 +22,14 @@ __all__ = [
     "Binarizer",
 ]
 
+# Intermediate column with the norm of each row, used by Normalizer.transform
+_NORM_COL = "NORMALIZER_NORM__"
+# Number of buckets of the row hash used by RobustScaler to sample rows
+_SAMPLE_BUCKETS = 1000000
+
 def _get_numeric_columns(df: DataFrame) -> List:
     numeric_types = [T.DecimalType, T.LongType, T.DoubleType, T.FloatType, T.IntegerType]
-    numeric_cols = [c.name for c in df.schema.fields if type(c.datatype) in numeric_types]
+    numeric_cols = [c.name for c in _get_schema(df).fields if type(c.datatype) in numeric_types]
 
     if len(numeric_cols) == 0:
         raise ValueError(
@@ -41,6 +50,14 @@ def _fix_scale_columns(df, scale_columns) -> List:
     return scale_columns
 
 
+def _collect_chunk_values(scaler, df) -> Dict:
+    # Statistics of one chunk for partial_fit, without the fit cache since each chunk is only seen once
+    if _is_local_df(df):
+        return _collect_local_fitted_values(scaler, df)
+
+    return _collect_fitted_values(df, scaler._get_fit_exprs(df))
+
+
 def _check_output_columns(output_cols, input_columns) -> List:
     if output_cols:
         if not isinstance(output_cols, list):
@@ -80,6 +97,20 @@ class MinMaxScaler:
         :param df: Snowpark DataFrame to be scaled
         :return: fitted scaler
         """
+        if _is_local_df(df):
+            return _local_fit(self, df)
+
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self
+
+        obj_const_log = self._get_fit_exprs(df)
+        self._set_fitted_values(_collect_fitted_values(df, obj_const_log))
+        _save_fit_cache(self, df, cache_path)
+
+        return self
+
+    def _get_fit_exprs(self, df: DataFrame) -> List:
         feature_range = self.feature_range
         if feature_range[0] >= feature_range[1]:
             raise ValueError(
@@ -95,38 +126,45 @@ class MinMaxScaler:
             raise ValueError(
                 "No columns to fit, the DataFrame has no numeric columns")
 
-        # Maybe better to return {"COL1": {"MIN": nbr, "MAX": nbr }}
-        select_calc = []
-        range_cols_exp = []
-        range_cols_names = []
-        scale_cols_exp = []
-        scale_cols_names = []
-        min_cols_exp = []
-        min_cols_names = []
+        # All values are calculated in the same aggregation so it can be combined with other transformers. Only min
+        # and max are aggregated, the scale is calculated from them so constant columns does not divide by zero
         obj_const_log = []
         for col in scale_columns:
-            select_calc.extend([F.max(F.col(col)).as_("max_" + col), F.min(F.col(col)).as_("min_" + col)])
-            range_cols_names.extend(["range_" + col])
-            range_cols_exp.extend([(F.col("max_" + col) - F.col("min_" + col))])
-            scale_cols_names.extend(["scale_" + col])
-            scale_cols_exp.extend([(F.lit(feature_range[1]) - F.lit(feature_range[0])) / F.col("range_" + col)])
-            min_cols_names.extend(["min__" + col])
-            min_cols_exp.extend([(F.lit(feature_range[0]) - F.col("min_" + col) * F.col("scale_" + col))])
-            obj_const_log.extend([F.lit(col), F.object_construct(F.lit("max"), F.col("max_" + col),
-                                                                 F.lit("min"), F.col("min_" + col),
-                                                                 F.lit("range"), F.col("range_" + col),
-                                                                 F.lit("scale"), F.col("scale_" + col),
-                                                                 F.lit("min_"), F.col("min__" + col))])
-
-        df_fitted_values = df.select(select_calc) \
-            .with_columns(range_cols_names, range_cols_exp) \
-            .with_columns(scale_cols_names, scale_cols_exp) \
-            .with_columns(min_cols_names, min_cols_exp) \
-            .select(F.object_construct(*obj_const_log))
-
-        fitted_values = json.loads(df_fitted_values.collect()[0][0])
-        # Store the column order?
-        self.fitted_values_ = fitted_values
+            obj_const_log.extend([F.lit(col), F.object_construct(F.lit("max"), F.max(F.col(col)),
+                                                                 F.lit("min"), F.min(F.col(col)),
+                                                                 F.lit("count"), F.count(F.col(col)))])
+
+        return obj_const_log
+
+    def _set_fitted_values(self, fitted_values: Dict):
+        # NULL values are not included by object_construct, so a column without values has no min and max
+        self.fitted_values_ = {col: _get_min_max_values(fitted_values.get(col, {}).get("min"),
+                                                        fitted_values.get(col, {}).get("max"), self.feature_range)
+                               for col in self.input_cols}
+
+    def partial_fit(self, df: DataFrame):
+        """
+        Update min and max with the rows in df, only df is scanned.
+
+        If the scaler is not fitted this is the same as fit.
+
+        :param df: Snowpark, pandas or Polars DataFrame with new rows
+        :return: fitted scaler
+        """
+        if not hasattr(self, "fitted_values_"):
+            return self.fit(df)
+
+        chunk_values = _collect_chunk_values(self, df)
+
+        fitted_values = {}
+        for col in self.input_cols:
+            # Empty chunks and chunks where the column is only NULL has no min and max and does not change them
+            values = [self.fitted_values_[col], chunk_values.get(col, {})]
+            maxs = [value["max"] for value in values if value.get("max") is not None]
+            mins = [value["min"] for value in values if value.get("min") is not None]
+            fitted_values[col] = {"max": max(maxs) if maxs else None, "min": min(mins) if mins else None}
+
+        self._set_fitted_values(fitted_values)
 
         return self
 
@@ -147,9 +185,19 @@ class MinMaxScaler:
         :return: Snowpark DataFrame with scaled columns
 
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         # Check if fitted otherwise raise error!
         _check_fitted(self)
 
+        output_cols, col_exprs, _ = self._get_transform_exprs(F.col)
+        # Do the scaling
+        trans_df = _with_columns(df, output_cols, col_exprs)
+
+        return trans_df
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
         # If not provided columns to scale
         scale_columns = self.input_cols
         if not isinstance(scale_columns, list):
@@ -159,12 +207,10 @@ class MinMaxScaler:
         self.output_cols = output_cols
 
         fitted_values = self.fitted_values_
-        # Do the scaling
-        trans_df = df.with_columns(output_cols,
-                                   [((F.col(col) * F.lit(fitted_values[col]["scale"])) + fitted_values[col]["min_"])
-                                    for col in scale_columns])
+        col_exprs = [((get_col(col) * F.lit(fitted_values[col]["scale"])) + fitted_values[col]["min_"])
+                     for col in scale_columns]
 
-        return trans_df
+        return output_cols, col_exprs, []
 
     def inverse_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -173,6 +219,9 @@ class MinMaxScaler:
         :param df: Snowpark DataFrame with scaled output columns
         :return: Snowpark DataFrame with undone scaling
         """
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
+
         # Check if fitted otherwise raise error!
         _check_fitted(self)
 
@@ -186,10 +235,10 @@ class MinMaxScaler:
         # as the input
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [((F.col(in_out[1]) - fitted_values[in_out[0]]["min_"]) / F.lit(
-                                       fitted_values[in_out[0]]["scale"]))
-                                    for in_out in input_output])
+        trans_df = _with_columns(df, output_cols,
+                                     [((F.col(in_out[1]) - fitted_values[in_out[0]]["min_"]) / F.lit(
+                                         fitted_values[in_out[0]]["scale"]))
+                                      for in_out in input_output])
 
         return trans_df
 
@@ -203,6 +252,26 @@ class MinMaxScaler:
 
         return _generate_udf_encoder(self)
 
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the MinMaxScaler as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "MinMaxScaler":
+        """
+        Load a MinMaxScaler saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: MinMaxScaler
+        """
+        return _load_transformer(cls, path, session)
+
 
 class StandardScaler:
     def __init__(self, *, with_mean=True, with_std=True,
@@ -229,6 +298,20 @@ class StandardScaler:
         :param df: Snowpark DataFrame to be scaled
         :return: fitted encoder
         """
+        if _is_local_df(df):
+            return _local_fit(self, df)
+
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self
+
+        obj_const_log = self._get_fit_exprs(df)
+        self._set_fitted_values(_collect_fitted_values(df, obj_const_log))
+        _save_fit_cache(self, df, cache_path)
+
+        return self
+
+    def _get_fit_exprs(self, df: DataFrame) -> List:
         # Not using sample_weight=None for now!
 
         # Validate data
@@ -242,6 +325,19 @@ class StandardScaler:
         # if sample_weight is not None:
         # sample_weight is one per row
 
+        obj_const_log = []
+        if self.with_mean or self.with_std:
+            for col in scale_columns:
+                obj_const_log.extend([F.lit(col), F.object_construct(F.lit("mean"), F.mean(F.col(col)),
+                                                                     F.lit("scale"), F.stddev(F.col(col)),
+                                                                     F.lit("count"), F.count(F.col(col)),
+                                                                     F.lit("var_pop"), F.var_pop(F.col(col)))])
+
+        return obj_const_log
+
+    def _set_fitted_values(self, fitted_values: Dict):
+        scale_columns = self.input_cols
+
         if not self.with_mean and not self.with_std:
             fitted_values = {}
             for col in scale_columns:
@@ -249,14 +345,16 @@ class StandardScaler:
                 fitted_values[col]['mean'] = 0
                 fitted_values[col]['scale'] = 1
         else:
-            obj_const_log = []
+            # Keep the count, mean and sum of squared differences from the mean for partial_fit
+            stats = {}
             for col in scale_columns:
-                obj_const_log.extend([F.lit(col), F.object_construct(F.lit("mean"), F.mean(F.col(col)),
-                                                                     F.lit("scale"), F.stddev(F.col(col)))])
-
-            df_fitted_values = df.select(F.object_construct(*obj_const_log))
-
-            fitted_values = json.loads(df_fitted_values.collect()[0][0])
+                count = fitted_values[col].pop("count", 0)
+                var_pop = fitted_values[col].pop("var_pop", None) or 0
+                # AVG and STDDEV are NULL, and not part of the object, for columns with fewer than one and two values
+                fitted_values[col].setdefault("mean", None)
+                fitted_values[col].setdefault("scale", None)
+                stats[col] = {"count": count, "mean": fitted_values[col]["mean"] or 0, "m2": var_pop * count}
+            self.stats_ = stats
 
             if not self.with_std:
                 #    self.scale_ = np.array(mean_var["stddev"])
@@ -268,6 +366,43 @@ class StandardScaler:
 
         self.fitted_values_ = fitted_values
 
+    def partial_fit(self, df: DataFrame):
+        """
+        Update the mean and std with the rows in df, only df is scanned.
+
+        The count, mean and variance of df are merged with the stored ones using the parallel algorithm of Chan et al.
+        If the scaler is not fitted this is the same as fit.
+
+        :param df: Snowpark, pandas or Polars DataFrame with new rows
+        :return: fitted scaler
+        """
+        if not hasattr(self, "stats_"):
+            return self.fit(df)
+
+        chunk_values = _collect_chunk_values(self, df)
+
+        fitted_values = {}
+        for col in self.input_cols:
+            count_a, mean_a, m2_a = self.stats_[col]["count"], self.stats_[col]["mean"], self.stats_[col]["m2"]
+            chunk_col = chunk_values.get(col, {})
+            count_b = chunk_col.get("count", 0)
+            mean_b = chunk_col.get("mean") or 0
+            m2_b = (chunk_col.get("var_pop") or 0) * count_b
+
+            count = count_a + count_b
+            if count == 0:
+                fitted_values[col] = {"count": 0}
+                continue
+
+            delta = mean_b - mean_a
+            mean = mean_a + delta * count_b / count
+            m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / count
+            # Same as STDDEV, ie the sample standard deviation that is NULL for one value
+            fitted_values[col] = {"mean": mean, "scale": (m2 / (count - 1)) ** 0.5 if count > 1 else None,
+                                  "count": count, "var_pop": m2 / count}
+
+        self._set_fitted_values(fitted_values)
+
         return self
 
     def transform(self, df: DataFrame) -> DataFrame:
@@ -277,20 +412,28 @@ class StandardScaler:
         :param df: Snowpark DataFrame to be scaled.
         :return: Snowpark DataFrame with scaled columns
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         # Need check if fitted
         _check_fitted(self)
 
+        output_cols, col_exprs, _ = self._get_transform_exprs(F.col)
+        trans_df = _with_columns(df, output_cols, col_exprs)
+
+        return trans_df
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
         scale_columns = self.input_cols
 
         output_cols = _check_output_columns(self.output_cols, scale_columns)
         self.output_cols = output_cols
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [((F.col(col) - F.lit(fitted_values[col]["mean"])) / fitted_values[col]["scale"])
-                                    for col in scale_columns])
+        col_exprs = [((get_col(col) - F.lit(fitted_values[col]["mean"])) / fitted_values[col]["scale"])
+                     for col in scale_columns]
 
-        return trans_df
+        return output_cols, col_exprs, []
 
     def fit_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -309,6 +452,9 @@ class StandardScaler:
         :param df: Snowpark DataFrame with scaled output columns
         :return: Snowpark DataFrame with undone scaling
         """
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
+
         # Check if fitted otherwise raise error!
         _check_fitted(self)
         input_cols = self.input_cols
@@ -320,10 +466,10 @@ class StandardScaler:
 
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [((F.col(col[1]) * fitted_values[col[0]]["scale"]) + F.lit(
-                                       fitted_values[col[0]]["mean"]))
-                                    for col in input_output])
+        trans_df = _with_columns(df, output_cols,
+                                     [((F.col(col[1]) * fitted_values[col[0]]["scale"]) + F.lit(
+                                         fitted_values[col[0]]["mean"]))
+                                      for col in input_output])
 
         return trans_df
 
@@ -337,6 +483,26 @@ class StandardScaler:
 
         return _generate_udf_encoder(self)
 
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the StandardScaler as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "StandardScaler":
+        """
+        Load a StandardScaler saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: StandardScaler
+        """
+        return _load_transformer(cls, path, session)
+
 
 class MaxAbsScaler:
     def __init__(self, *,
@@ -359,6 +525,20 @@ class MaxAbsScaler:
         :param df: Snowpark DataFrame to be scaled
         :return: fitted scaler
         """
+        if _is_local_df(df):
+            return _local_fit(self, df)
+
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self
+
+        obj_const_log = self._get_fit_exprs(df)
+        self._set_fitted_values(_collect_fitted_values(df, obj_const_log))
+        _save_fit_cache(self, df, cache_path)
+
+        return self
+
+    def _get_fit_exprs(self, df: DataFrame) -> List:
         scale_columns = _fix_scale_columns(df, self.input_cols)
         self.input_cols = scale_columns
 
@@ -368,13 +548,11 @@ class MaxAbsScaler:
                                                                  F.lit("scale"), F.iff(
                     F.abs(F.max(F.col(col))) > (F.lit(10) * F.pow(2, -52)), F.abs(F.max(F.col(col))), F.lit(1)))])
 
-        df_fitted_values = df.select(F.object_construct(*obj_const_log))
+        return obj_const_log
 
-        fitted_values = json.loads(df_fitted_values.collect()[0][0])
+    def _set_fitted_values(self, fitted_values: Dict):
         self.fitted_values_ = fitted_values
 
-        return self
-
     def fit_transform(self, df: DataFrame) -> DataFrame:
         """
 
@@ -390,8 +568,16 @@ class MaxAbsScaler:
         :param df: Snowpark DataFrame to be scaled.
         :return: Snowpark DataFrame with scaled columns
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         _check_fitted(self)
 
+        output_cols, col_exprs, _ = self._get_transform_exprs(F.col)
+        trans_df = _with_columns(df, output_cols, col_exprs)
+        return trans_df
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
         scale_columns = self.input_cols
 
         output_cols = _check_output_columns(self.output_cols, scale_columns)
@@ -399,9 +585,8 @@ class MaxAbsScaler:
 
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [(F.col(col) / fitted_values[col]["scale"]) for col in scale_columns])
-        return trans_df
+        col_exprs = [(get_col(col) / fitted_values[col]["scale"]) for col in scale_columns]
+        return output_cols, col_exprs, []
 
     def inverse_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -411,6 +596,9 @@ class MaxAbsScaler:
         :param df: DataFrame to inverse
         :return: DataFrame with inversed columns
         """
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
+
         _check_fitted(self)
         output_cols = self.output_cols
         input_cols = self.input_cols
@@ -420,8 +608,8 @@ class MaxAbsScaler:
 
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [(F.col(col[1]) * fitted_values[col[0]]["scale"]) for col in input_output])
+        trans_df = _with_columns(df, output_cols,
+                                     [(F.col(col[1]) * fitted_values[col[0]]["scale"]) for col in input_output])
         return trans_df
 
     def get_udf_encoder(self):
@@ -434,6 +622,26 @@ class MaxAbsScaler:
 
         return _generate_udf_encoder(self)
 
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the MaxAbsScaler as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "MaxAbsScaler":
+        """
+        Load a MaxAbsScaler saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: MaxAbsScaler
+        """
+        return _load_transformer(cls, path, session)
+
 
 class RobustScaler:
     def __init__(
@@ -443,6 +651,9 @@ class RobustScaler:
             with_scaling=True,
             quantile_range=(25.0, 75.0),
             unit_variance=False,
+            approx=False,
+            sample_fraction: Optional[float] = None,
+            seed: int = 0,
             input_cols: Optional[Union[List[str], str]] = None,
             output_cols: Optional[Union[List[str], str]] = None,
     ):
@@ -457,16 +668,27 @@ class RobustScaler:
         :param with_scaling: If True, scale the data to interquartile range.
         :param quantile_range: Quantile range used to calculate scale_. By default this is equal to the IQR
         :param unit_variance:  If True, scale data so that normally distributed features have a variance of 1
+        :param approx: If True, use APPROX_PERCENTILE (t-digest) instead of exact MEDIAN and PERCENTILE_CONT
+        :param sample_fraction: If provided, only this fraction of the rows is used for the statistics. Rows are kept
+                                based on a hash of the row and the seed, so the sample is fitted with its own query
+                                and not together with other transformers in fit_all
+        :param seed: Seed of the row hash used by sample_fraction, the same data and seed gives the same sample
         :param input_cols: Column or columns to scale, if not provided all numeric columns in the dataframe will be used
         :param output_cols: Names of scaled columns, if not provided output columns will have the same names as the input columns
 
         """
+        if sample_fraction is not None and not 0 < sample_fraction <= 1:
+            raise ValueError("Invalid sample_fraction: %s" % str(sample_fraction))
+
         self.input_cols = input_cols
         self.output_cols = output_cols
         self.with_centering = with_centering
         self.with_scaling = with_scaling
         self.quantile_range = quantile_range
         self.unit_variance = unit_variance
+        self.approx = approx
+        self.sample_fraction = sample_fraction
+        self.seed = seed
 
     def fit(self, df: DataFrame):
         """
@@ -474,6 +696,38 @@ class RobustScaler:
         :param df: Snowpark DataFrame to be scaled
         :return: fitted scaler
         """
+        if _is_local_df(df):
+            return _local_fit(self, df)
+
+        cache_path = _get_fit_cache_path(self, df)
+        if _load_fit_cache(self, df, cache_path):
+            return self
+
+        obj_const_log = self._get_agg_exprs(df)
+        self._set_fitted_values(_collect_fitted_values(self._sample(df), obj_const_log))
+        _save_fit_cache(self, df, cache_path)
+
+        return self
+
+    def _sample(self, df: DataFrame) -> DataFrame:
+        if self.sample_fraction is None:
+            return df
+
+        # The rows are filtered once, so all statistics are calculated on the same rows. Identical rows gets the same
+        # hash, so the sample does not depend on the order the rows are read in
+        row_hash = F.hash(F.lit(self.seed), *[F.col(col) for col in _get_columns(df)])
+        bound = int(round(self.sample_fraction * _SAMPLE_BUCKETS))
+
+        return df.filter(F.abs(row_hash) % F.lit(_SAMPLE_BUCKETS) < F.lit(bound))
+
+    def _get_fit_exprs(self, df: DataFrame) -> Optional[List]:
+        if self.sample_fraction is not None:
+            # The sample needs its own query
+            return None
+
+        return self._get_agg_exprs(df)
+
+    def _get_agg_exprs(self, df: DataFrame) -> List:
         # Validate data
         scale_columns = _fix_scale_columns(df, self.input_cols)
         self.input_cols = scale_columns
@@ -484,18 +738,26 @@ class RobustScaler:
 
         # Convert it into percentiles values supported by Snowflake
         snf_q_range = [q / 100 for q in list(self.quantile_range)]
+
         obj_const_log = []
         for col in scale_columns:
             key_vals = []
 
             if self.with_centering:
-                key_vals.extend([F.lit("center"), F.median(F.col(col))])
+                if self.approx:
+                    key_vals.extend([F.lit("center"), F.sql_expr(f"APPROX_PERCENTILE({col}, 0.5)")])
+                else:
+                    key_vals.extend([F.lit("center"), F.median(F.col(col))])
             else:
                 key_vals.extend([F.lit("center"), F.lit(0)])
 
             if self.with_scaling:
-                scaled_sql = f"(PERCENTILE_CONT({snf_q_range[1]}) WITHIN GROUP (ORDER BY {col}) - " \
-                             f"PERCENTILE_CONT({snf_q_range[0]}) WITHIN GROUP (ORDER BY {col}))"
+                if self.approx:
+                    scaled_sql = f"(APPROX_PERCENTILE({col}, {snf_q_range[1]}) - " \
+                                 f"APPROX_PERCENTILE({col}, {snf_q_range[0]}))"
+                else:
+                    scaled_sql = f"(PERCENTILE_CONT({snf_q_range[1]}) WITHIN GROUP (ORDER BY {col}) - " \
+                                 f"PERCENTILE_CONT({snf_q_range[0]}) WITHIN GROUP (ORDER BY {col}))"
 
                 if self.unit_variance:
                     adjust = stats.norm.ppf(q_max / 100.0) - stats.norm.ppf(q_min / 100.0)
@@ -504,13 +766,31 @@ class RobustScaler:
                 key_vals.extend([F.lit("scale"), F.sql_expr(scaled_sql)])
             else:
                 key_vals.extend([F.lit("scale"), F.lit(1)])
+
+            if self.approx or self.sample_fraction is not None:
+                key_vals.extend([F.lit("nbr_rows"), F.count(F.col(col))])
             obj_const_log.extend([F.lit(col), F.object_construct(*key_vals)])
 
-        df_fitted_values = df.select(F.object_construct(*obj_const_log))
-        fitted_values = json.loads(df_fitted_values.collect()[0][0])
-        self.fitted_values_ = fitted_values
+        return obj_const_log
+
+    def _set_fitted_values(self, fitted_values: Dict):
+        if self.approx or self.sample_fraction is not None:
+            # Standard error, in quantile units, of the estimated quantiles given the number of rows used.
+            # APPROX_PERCENTILE adds the t-digest error on top of this, which is small compared to sampling
+            quantiles = [0.5] + [q / 100 for q in list(self.quantile_range)]
+            approx_error = {}
+            for col in self.input_cols:
+                nbr_rows = fitted_values[col].pop("nbr_rows", 0)
+                approx_error[col] = {
+                    "method": "approx_percentile" if self.approx else "percentile_cont",
+                    "sample_fraction": self.sample_fraction if self.sample_fraction is not None else 1.0,
+                    "nbr_rows": nbr_rows,
+                    "quantile_std_error": max((q * (1 - q) / nbr_rows) ** 0.5 for q in quantiles)
+                    if nbr_rows else None,
+                }
+            self.approx_error_ = approx_error
 
-        return self
+        self.fitted_values_ = fitted_values
 
     def fit_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -530,19 +810,27 @@ class RobustScaler:
         :return: Snowpark DataFrame with scaled columns
 
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         _check_fitted(self)
 
+        output_cols, col_exprs, _ = self._get_transform_exprs(F.col)
+        trans_df = _with_columns(df, output_cols, col_exprs)
+
+        return trans_df
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
         scale_columns = self.input_cols
 
         output_cols = _check_output_columns(self.output_cols, scale_columns)
         self.output_cols = output_cols
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [((F.col(col) - fitted_values[col]["center"]) / fitted_values[col]["scale"])
-                                    for col in scale_columns])
+        col_exprs = [((get_col(col) - fitted_values[col]["center"]) / fitted_values[col]["scale"])
+                     for col in scale_columns]
 
-        return trans_df
+        return output_cols, col_exprs, []
 
     def inverse_transform(self, df: DataFrame) -> DataFrame:
         """
@@ -552,6 +840,8 @@ class RobustScaler:
         :param df: DataFrame to inverse
         :return: DataFrame with inversed columns
         """
+        if _is_local_df(df):
+            return _local_inverse_transform(self, df)
 
         _check_fitted(self)
 
@@ -563,9 +853,9 @@ class RobustScaler:
 
         fitted_values = self.fitted_values_
 
-        trans_df = df.with_columns(output_cols,
-                                   [((F.col(col[1]) * fitted_values[col[0]]["scale"]) + fitted_values[col[0]]["center"])
-                                    for col in input_output])
+        trans_df = _with_columns(df, output_cols,
+                                     [((F.col(col[1]) * fitted_values[col[0]]["scale"]) + fitted_values[col[0]]["center"])
+                                      for col in input_output])
         return trans_df
 
     def get_udf_encoder(self):
@@ -578,57 +868,48 @@ class RobustScaler:
 
         return _generate_udf_encoder(self)
 
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the RobustScaler as JSON.
 
-class Normalizer:
-
-    def _get_sql_norms(self, norm):
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
 
-        if norm not in ("l1", "l2", "max"):
-            raise ValueError("'%s' is not a supported norm" % norm)
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "RobustScaler":
+        """
+        Load a RobustScaler saved with save.
 
-        scale_columns = self.input_cols
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: RobustScaler
+        """
+        return _load_transformer(cls, path, session)
 
-        if norm == "l1":
-            sql_abs = []
-            for col in scale_columns:
-                sql_col_abs = 'ABS({0})'.format(col)
-                sql_abs.append(sql_col_abs)
-
-            sql_sum = ''
-            for col in sql_abs:
-                if sql_sum != '':
-                    sql_sum = sql_sum + '+'
-                sql_sum = sql_sum + col
-
-            sql_norms = '({0})'.format(sql_sum)
-        elif norm == "l2":
-            sql_square = []
-            for col in scale_columns:
-                sql_col_sqr = 'SQUARE({0})'.format(col)
-                sql_square.append(sql_col_sqr)
 
-            sql_sum = ''
-            for col in sql_square:
-                if sql_sum != '':
-                    sql_sum = sql_sum + '+'
-                sql_sum = sql_sum + col
+class Normalizer:
 
-            sql_norms = 'SQRT({0})'.format(sql_sum)
+    def _get_norm_expr(self):
+        # Built as a balanced tree so the depth of the expression grows with log(N) of the number of columns
+        def sum_cols(col_exprs):
+            if len(col_exprs) == 1:
+                return col_exprs[0]
+            middle = len(col_exprs) // 2
+            return sum_cols(col_exprs[:middle]) + sum_cols(col_exprs[middle:])
 
-        elif norm == "max":
-            sql_abs = []
-            for col in scale_columns:
-                sql_col_abs = 'ABS({0})'.format(col)
-                sql_abs.append(sql_col_abs)
+        scale_columns = self.input_cols
 
-            sql_sum = ''
-            for col in sql_abs:
-                if sql_sum != '':
-                    sql_sum = sql_sum + ','
-                sql_sum = sql_sum + col
+        if self.norm == "l1":
+            norm_expr = sum_cols([F.abs(F.col(col)) for col in scale_columns])
+        elif self.norm == "l2":
+            norm_expr = F.sqrt(sum_cols([F.square(F.col(col)) for col in scale_columns]))
+        else:
+            norm_expr = F.greatest(*[F.abs(F.col(col)) for col in scale_columns]) if len(scale_columns) > 1 \
+                else F.abs(F.col(scale_columns[0]))
 
-            sql_norms = 'GREATEST({0})'.format(sql_sum)
-        return sql_norms
+        return norm_expr
 
     def __init__(self,
                  *,
@@ -655,12 +936,17 @@ class Normalizer:
         :param df: Snowpark DataFrame to be scaled
         :return: fitted scaler
         """
+        if _is_local_df(df):
+            # fit does not use the data once the input columns are set
+            _resolve_local_input_cols(self, df)
+
+        if self.norm not in ("l1", "l2", "max"):
+            raise ValueError("'%s' is not a supported norm" % self.norm)
+
         scale_columns = _fix_scale_columns(df, self.input_cols)
         self.input_cols = scale_columns
 
-        sql_norms = self._get_sql_norms(self.norm)
-
-        self.fitted_values_ = {'norms_sql': sql_norms}
+        self.fitted_values_ = {'norm': self.norm}
 
         self.fitted_ = True
 
@@ -681,14 +967,19 @@ class Normalizer:
         :param df: Snowpark DataFrame to be scaled
         :return: Scaled Snowpark DataFrame
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         _check_fitted(self)
 
         scale_columns = self.input_cols
         output_cols = _check_output_columns(self.output_cols, scale_columns)
         self.output_cols = output_cols
-        sql_norms = self.fitted_values_["norms_sql"]
 
-        df_ret = df.with_columns(output_cols, [F.col(col) / F.sql_expr(sql_norms) for col in scale_columns])
+        # The norm is calculated once per row in its own column that all the output columns are divided by
+        df_norm = _with_columns(df, [_NORM_COL], [self._get_norm_expr()])
+        df_ret = _with_columns(df_norm, output_cols, [F.col(col) / F.col(_NORM_COL) for col in scale_columns],
+                               [_NORM_COL])
 
         return df_ret
 
@@ -706,6 +997,26 @@ class Normalizer:
 
         return udf_encoder
 
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the Normalizer as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "Normalizer":
+        """
+        Load a Normalizer saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: Normalizer
+        """
+        return _load_transformer(cls, path, session)
+
 
 class Binarizer:
     def __init__(self, *, threshold=0.0,
@@ -729,6 +1040,10 @@ class Binarizer:
         :param df: Snowpark DataFrame to be scaled
         :return: fitted scaler
         """
+        if _is_local_df(df):
+            # fit does not use the data once the input columns are set
+            _resolve_local_input_cols(self, df)
+
         scale_columns = _fix_scale_columns(df, self.input_cols)
         self.input_cols = scale_columns
         self.fitted_ = True
@@ -751,15 +1066,23 @@ class Binarizer:
         :param df: Snowpark DataFrame to be scaled
         :return: Snowpark DataFrame with binarized output columns
         """
+        if _is_local_df(df):
+            return _local_transform(self, df)
+
         _check_fitted(self)
+        output_cols, col_exprs, _ = self._get_transform_exprs(F.col)
+
+        df_ret = _with_columns(df, output_cols, col_exprs)
+        return df_ret
+
+    def _get_transform_exprs(self, get_col) -> Tuple[List, List, List]:
         scale_columns = self.input_cols
         output_cols = _check_output_columns(self.output_cols, scale_columns)
         self.output_cols = output_cols
 
         # All values that are larger than threshold should be 1 and others 0
-        df_ret = df.with_columns(output_cols, [F.iff(F.col(col) > F.lit(self.threshold), F.lit(1), F.lit(0))
-                                               for col in scale_columns])
-        return df_ret
+        col_exprs = [F.iff(get_col(col) > F.lit(self.threshold), F.lit(1), F.lit(0)) for col in scale_columns]
+        return output_cols, col_exprs, []
 
     def get_udf_encoder(self):
         """
@@ -775,3 +1098,24 @@ class Binarizer:
                        "output_cols": self.output_cols, "fitted_values": {"threshold": self.threshold}}
 
         return udf_encoder
+
+    def save(self, path: str, session: Optional[Session] = None):
+        """
+        Save the parameters and fitted values of the Binarizer as JSON.
+
+        :param path: Local file or stage path, starting with @, to save to
+        :param session: Snowpark Session, needed when saving to a stage
+        """
+        _save_transformer(self, path, session)
+
+    @classmethod
+    def load(cls, path: str, session: Optional[Session] = None) -> "Binarizer":
+        """
+        Load a Binarizer saved with save.
+
+        :param path: Local file or stage path, starting with @, to load from
+        :param session: Snowpark Session, needed when loading from a stage
+        :return: Binarizer
+        """
+        return _load_transformer(cls, path, session)
+
@@ -0,0 +1,447 @@
+from collections import OrderedDict
+from typing import Dict, List, Union
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+__all__ = [
+    "udf_transform",
+    "UdfTransformPlan",
+    "compile_udf_encoders",
+    "load_udf_plan",
+    "sparse_to_csr",
+]
+
+
+def _as_list(cols) -> List:
+    if cols is None:
+        return []
+    if not isinstance(cols, list):
+        return [cols]
+    return cols
+
+
+def _format_value(val) -> str:
+    # Same text as TO_VARCHAR in Snowflake. Integer columns with NULL values are float64 in pandas, so whole floats
+    # are formatted as integers, other floats with 15 significant digits as Snowflake does for FLOAT
+    if isinstance(val, (bool, np.bool_)):
+        return "true" if val else "false"
+    if isinstance(val, (float, np.floating)):
+        if float(val).is_integer() and abs(val) < 2 ** 53:
+            return str(int(val))
+        return "%.15g" % val
+    if isinstance(val, (int, np.integer)):
+        return str(int(val))
+    return str(val)
+
+
+def _to_varchar(values: pd.Series) -> pd.Series:
+    # Values as the text used by the SQL encoders, missing values are kept as None. Each distinct value is only
+    # formatted once
+    codes, uniques = pd.factorize(values)
+    texts = np.array([_format_value(val) for val in uniques] + [None], dtype=object)
+
+    return pd.Series(texts[codes], index=values.index, dtype=object)
+
+
+class _Lookup:
+    # Sorted categories used for looking up the index of values with a binary search
+    def __init__(self, categories: List):
+        cats = np.asarray(categories, dtype=str)
+        self.order = np.argsort(cats, kind="stable")
+        self.sorted_cats = cats[self.order]
+        self.nbr_categories = len(cats)
+
+    def index(self, values: pd.Series) -> np.ndarray:
+        # Returns the position of each value in categories, -1 for unknown and missing values.
+        # The values are compared as strings since the categories are fitted using TO_VARCHAR
+        texts = _to_varchar(values)
+        missing = texts.isna().to_numpy()
+        str_values = texts.fillna("").to_numpy(dtype=str)
+
+        if self.nbr_categories == 0:
+            return np.full(len(str_values), -1, dtype=np.int64)
+
+        pos = np.searchsorted(self.sorted_cats, str_values)
+        np.clip(pos, 0, self.nbr_categories - 1, out=pos)
+        found = (self.sorted_cats[pos] == str_values) & ~missing
+
+        return np.where(found, self.order[pos], -1)
+
+
+class _Step:
+    def __init__(self):
+        self._buffer = None
+
+    def _get_buffer(self, nbr_rows: int, nbr_cols: int, dtype) -> np.ndarray:
+        # The buffer is kept between batches and only reallocated if a larger batch is seen
+        if self._buffer is None or self._buffer.shape[0] < nbr_rows:
+            self._buffer = np.empty((nbr_rows, nbr_cols), dtype=dtype)
+        return self._buffer[:nbr_rows]
+
+
+class _ScalerStep(_Step):
+    def __init__(self, udf_encoder: Dict):
+        super().__init__()
+        self.input_cols = _as_list(udf_encoder["input_features"])
+        self.output_cols = _as_list(udf_encoder["output_cols"]) or self.input_cols
+        fitted_values = udf_encoder["fitted_values"]
+        encoder = udf_encoder["encoder"]
+
+        # MinMaxScaler is X * scale + min_ the other scalers (X - center) / scale
+        self.multiply = encoder == "MinMaxScaler"
+        if encoder == "MinMaxScaler":
+            self.center = np.asarray(fitted_values["min_"], dtype=np.float64)
+        elif encoder == "StandardScaler":
+            self.center = np.asarray(fitted_values["mean"], dtype=np.float64)
+        elif encoder == "RobustScaler":
+            self.center = np.asarray(fitted_values["center"], dtype=np.float64)
+        else:
+            self.center = None
+        self.scale = np.asarray(fitted_values["scale"], dtype=np.float64)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        X = self._get_buffer(len(df), len(self.input_cols), np.float64)
+        X[:] = df[self.input_cols].to_numpy(dtype=np.float64)
+
+        if self.multiply:
+            np.multiply(X, self.scale, out=X)
+            np.add(X, self.center, out=X)
+        else:
+            if self.center is not None:
+                np.subtract(X, self.center, out=X)
+            np.divide(X, self.scale, out=X)
+
+        df[self.output_cols] = X
+        return df
+
+
+class _NormalizerStep(_Step):
+    def __init__(self, udf_encoder: Dict):
+        super().__init__()
+        self.input_cols = _as_list(udf_encoder["input_features"])
+        self.output_cols = _as_list(udf_encoder["output_cols"]) or self.input_cols
+        self.norm = udf_encoder["fitted_values"]["norm"]
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        X = self._get_buffer(len(df), len(self.input_cols), np.float64)
+        X[:] = df[self.input_cols].to_numpy(dtype=np.float64)
+
+        if self.norm == "l1":
+            norms = np.abs(X).sum(axis=1)
+        elif self.norm == "l2":
+            norms = np.sqrt(np.square(X).sum(axis=1))
+        else:
+            norms = np.abs(X).max(axis=1)
+        np.divide(X, norms[:, np.newaxis], out=X)
+
+        df[self.output_cols] = X
+        return df
+
+
+class _BinarizerStep(_Step):
+    def __init__(self, udf_encoder: Dict):
+        super().__init__()
+        self.input_cols = _as_list(udf_encoder["input_features"])
+        self.output_cols = _as_list(udf_encoder["output_cols"]) or self.input_cols
+        self.threshold = udf_encoder["fitted_values"]["threshold"]
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        X = self._get_buffer(len(df), len(self.input_cols), np.int64)
+        np.greater(df[self.input_cols].to_numpy(dtype=np.float64), self.threshold, out=X, casting="unsafe")
+
+        df[self.output_cols] = X
+        return df
+
+
+class _OneHotStep(_Step):
+    def __init__(self, udf_encoder: Dict):
+        super().__init__()
+        self.input_cols = _as_list(udf_encoder["input_features"])
+        output_cols = udf_encoder["output_cols"]
+        fitted_values = udf_encoder["fitted_values"]
+        # Infrequent and unknown values are flagged in the same column, named after the mode used
+        if udf_encoder.get("infrequent", False):
+            self.extra_suffix = "__infrequent"
+        elif udf_encoder.get("handle_unknown") == "keep":
+            self.extra_suffix = "__unknown"
+        else:
+            self.extra_suffix = None
+        self.drop_input_cols = udf_encoder.get("drop_input_cols", True)
+        self.sparse = udf_encoder.get("output", "dense") == "sparse"
+        self.sparse_col = udf_encoder.get("sparse_col")
+
+        # [(input column, lookup, output columns, offset in the output buffer)]
+        self.columns = []
+        offset = 0
+        for col in self.input_cols:
+            lookup = _Lookup(fitted_values[col])
+            self.columns.append((col, lookup, output_cols[col], offset))
+            offset += lookup.nbr_categories
+        self.width = offset
+
+    def _transform_sparse(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Same indices as ARRAY_CONSTRUCT_COMPACT in OneHotEncoder, -1 is used for values that are left out
+        indices = self._get_buffer(len(df), len(self.columns), np.int64)
+        offset = 0
+        for pos, (col, lookup, col_names, _) in enumerate(self.columns):
+            values = df[col]
+            idx = lookup.index(values)
+            if self.extra_suffix:
+                idx = np.where(pd.isna(values).to_numpy(), -1, np.where(idx >= 0, idx, lookup.nbr_categories))
+            indices[:, pos] = np.where(idx >= 0, idx + offset, -1)
+            offset += lookup.nbr_categories + (1 if self.extra_suffix else 0)
+
+        df[self.sparse_col] = [row[row >= 0].tolist() for row in indices]
+
+        if self.drop_input_cols:
+            df = df.drop(columns=self.input_cols)
+
+        return df
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.sparse:
+            return self._transform_sparse(df)
+
+        encoded = self._get_buffer(len(df), self.width, np.int64)
+        encoded.fill(0)
+        rows = np.arange(len(df))
+
+        # The output columns are added with one concat, adding them one by one fragments the DataFrame
+        blocks = []
+        for col, lookup, col_names, offset in self.columns:
+            values = df[col]
+            idx = lookup.index(values)
+            known = idx >= 0
+            encoded[rows[known], idx[known] + offset] = 1
+            blocks.append(pd.DataFrame(encoded[:, offset:offset + lookup.nbr_categories], columns=col_names,
+                                       index=df.index, copy=True))
+
+            if self.extra_suffix:
+                blocks.append(pd.DataFrame({col + self.extra_suffix: (~known & ~pd.isna(values).to_numpy())
+                                            .astype(np.int64)}, index=df.index))
+
+        new_cols = [name for block in blocks for name in block.columns]
+        df = pd.concat([df.drop(columns=[name for name in new_cols if name in df.columns])] + blocks, axis=1)
+
+        if self.drop_input_cols:
+            df = df.drop(columns=self.input_cols)
+
+        return df
+
+
+class _OrdinalStep(_Step):
+    def __init__(self, udf_encoder: Dict):
+        super().__init__()
+        input_cols = _as_list(udf_encoder["input_features"])
+        output_cols = _as_list(udf_encoder["output_cols"]) or input_cols
+        fitted_values = udf_encoder["fitted_values"]
+
+        if udf_encoder.get("handle_unknown") == "use_encoded_value":
+            self.unknown_value = udf_encoder["unknown_value"]
+        else:
+            self.unknown_value = np.nan
+        self.infrequent = udf_encoder.get("infrequent", False)
+
+        self.columns = [(in_col, out_col, _Lookup(fitted_values[in_col]))
+                        for in_col, out_col in zip(input_cols, output_cols)]
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        for in_col, out_col, lookup in self.columns:
+            values = df[in_col]
+            idx = lookup.index(values)
+            if (idx < 0).any():
+                if self.infrequent:
+                    # Infrequent and unknown values gets the index after the last kept category
+                    unknown_value = np.where(pd.isna(values).to_numpy(), np.nan, lookup.nbr_categories)
+                else:
+                    unknown_value = self.unknown_value
+                df[out_col] = np.where(idx >= 0, idx, unknown_value)
+            else:
+                df[out_col] = idx
+
+        return df
+
+
+class _HashingStep(_Step):
+    def __init__(self, udf_encoder: Dict):
+        super().__init__()
+        self.input_cols = _as_list(udf_encoder["input_features"])
+        self.output_cols = udf_encoder["output_cols"]
+        self.n_features = udf_encoder["fitted_values"]["n_features"]
+        self.drop_input_cols = udf_encoder.get("drop_input_cols", True)
+
+    def _buckets(self, col: str, values: pd.Series) -> np.ndarray:
+        # Same as MD5_NUMBER_LOWER64(col || '=' || value) % n_features, the lower 64 bits are the last 8 bytes of
+        # the digest as a big endian number. Each distinct value is only hashed once, missing values gets -1
+        codes, uniques = pd.factorize(values)
+        buckets = np.array([
+            int.from_bytes(hashlib.md5(f"{col}={_format_value(val)}".encode("utf-8")).digest()[8:], "big")
+            % self.n_features
+            for val in uniques
+        ], dtype=np.int64)
+
+        return np.where(codes >= 0, buckets[codes] if len(buckets) else -1, -1)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        encoded = self._get_buffer(len(df), self.n_features, np.int64)
+        encoded.fill(0)
+        rows = np.arange(len(df))
+
+        for col in self.input_cols:
+            buckets = self._buckets(col, df[col])
+            known = buckets >= 0
+            np.add.at(encoded, (rows[known], buckets[known]), 1)
+
+        df[self.output_cols] = encoded
+        if self.drop_input_cols:
+            df = df.drop(columns=self.input_cols)
+
+        return df
+
+
+_UDF_STEPS = {
+    "MinMaxScaler": _ScalerStep,
+    "StandardScaler": _ScalerStep,
+    "MaxAbsScaler": _ScalerStep,
+    "RobustScaler": _ScalerStep,
+    "Normalizer": _NormalizerStep,
+    "Binarizer": _BinarizerStep,
+    "OneHotEncoder": _OneHotStep,
+    "OrdinalEncoder": _OrdinalStep,
+    "LabelEncoder": _OrdinalStep,
+    "HashingEncoder": _HashingStep,
+}
+
+
+class UdfTransformPlan:
+    def __init__(self, udf_encoders: Union[Dict, List[Dict]]):
+        """
+        Compiled version of encoders exported with get_udf_encoder.
+
+        Lookup arrays for the categories and output buffers are created once, so transforming a batch does not need
+        to parse the encoder dictionaries again. A plan reuses its buffers and should not be shared between threads.
+
+        :param udf_encoders: Dictionary returned by get_udf_encoder or a list of them, applied in the order given
+        """
+        if isinstance(udf_encoders, dict):
+            udf_encoders = [udf_encoders]
+
+        steps = []
+        for udf_encoder in udf_encoders:
+            encoder = udf_encoder["encoder"]
+            if encoder not in _UDF_STEPS:
+                raise ValueError(f"{encoder} is not a supported encoder")
+            steps.append(_UDF_STEPS[encoder](udf_encoder))
+
+        self.steps = steps
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Transform a batch of rows.
+
+        :param df: Pandas DataFrame with columns named as the input features of the encoders
+        :return: Transformed Pandas DataFrame
+        """
+        df = df.copy()
+        for step in self.steps:
+            df = step.transform(df)
+
+        return df
+
+
+# Compiled plans per process, {key: plan}, the least recently used plan is removed when the cache is full
+_PLAN_CACHE = OrderedDict()
+_PLAN_CACHE_SIZE = 32
+
+
+def _get_cached_plan(key, build) -> UdfTransformPlan:
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = build()
+        _PLAN_CACHE[key] = plan
+        if len(_PLAN_CACHE) > _PLAN_CACHE_SIZE:
+            _PLAN_CACHE.popitem(last=False)
+    else:
+        _PLAN_CACHE.move_to_end(key)
+
+    return plan
+
+
+def compile_udf_encoders(udf_encoders: Union[Dict, List[Dict]]) -> UdfTransformPlan:
+    """
+    Returns a compiled plan for udf_encoders, the plan is cached per process for encoders with the same content.
+
+    :param udf_encoders: Dictionary returned by get_udf_encoder or a list of them, applied in the order given
+    :return: UdfTransformPlan
+    """
+    # The key is a hash of the content, so changed encoders gets a new plan
+    content = json.dumps(udf_encoders, sort_keys=True, default=str)
+    key = ("content", hashlib.sha1(content.encode("utf-8")).hexdigest())
+
+    return _get_cached_plan(key, lambda: UdfTransformPlan(udf_encoders))
+
+
+def load_udf_plan(path: str) -> UdfTransformPlan:
+    """
+    Load encoders saved as a JSON file, for example in the import directory of a UDF, and compile them.
+
+    The plan is cached per process so it is only loaded for the first batch, it is loaded again if the file changes.
+
+    :param path: Path to a JSON file with a list of dictionaries returned by get_udf_encoder
+    :return: UdfTransformPlan
+    """
+    def build():
+        with open(path, "r") as f:
+            return UdfTransformPlan(json.load(f))
+
+    return _get_cached_plan(("path", path, os.path.getmtime(path)), build)
+
+
+def udf_transform(udf_encoders: Union[Dict, List[Dict]], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Transform a Pandas DataFrame using encoders exported with get_udf_encoder.
+
+    All encoders are applied with vectorized NumPy operations so it can be used in vectorized UDFs and
+    stored procedures. The columns of df needs to be named as the input features of the encoders.
+    Use compile_udf_encoders or load_udf_plan when the same encoders are applied on many batches.
+
+    :param udf_encoders: Dictionary returned by get_udf_encoder or a list of them, applied in the order given
+    :param df: Pandas DataFrame to transform
+    :return: Transformed Pandas DataFrame
+    """
+    return UdfTransformPlan(udf_encoders).transform(df)
+
+
+def sparse_to_csr(indices: pd.Series, nbr_features: int):
+    """
+    Convert the indices created by OneHotEncoder with output='sparse' to a scipy.sparse.csr_matrix.
+
+    :param indices: Pandas Series with the indices of each row, as lists or as the JSON strings returned by to_pandas
+    :param nbr_features: Number of columns of the matrix, the length of get_feature_names() of the encoder
+    :return: scipy.sparse.csr_matrix with one row per row of indices
+    """
+    try:
+        from scipy import sparse
+    except ImportError:
+        raise ImportError("scipy is required for sparse_to_csr")
+
+    rows = []
+    for row in indices:
+        if isinstance(row, str):
+            row = json.loads(row)
+        elif not isinstance(row, (list, tuple, np.ndarray)):
+            # Missing value
+            row = []
+        rows.append(row)
+
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in rows], out=indptr[1:])
+    col_indices = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=int(indptr[-1]))
+    data = np.ones(len(col_indices), dtype=np.float64)
+
+    return sparse.csr_matrix((data, col_indices, indptr), shape=(len(rows), nbr_features))
@@ -1,3 +1,13 @@
+from typing import List, Optional
+import json
+import re
+import weakref
+
+import snowflake.snowpark.functions as F
+
+# Column names of DataFrames, kept as long as the DataFrame exists. DataFrames created by the transformers are seeded
+# with their column names, so checking the columns in a chain of transformations only needs one describe query
+_SCHEMA_CACHE = weakref.WeakKeyDictionary()
 
 
 def _check_fitted(encoder):
@@ -11,9 +21,56 @@ def _check_fitted(encoder):
         raise TypeError(f"This {type(encoder).__name__}s instance is not fitted.")
 
 
+def _get_columns(df) -> List[str]:
+    cached = _SCHEMA_CACHE.setdefault(df, {})
+    if "columns" not in cached:
+        cached["columns"] = df.columns
+
+    return cached["columns"]
+
+
+def _get_schema(df):
+    cached = _SCHEMA_CACHE.setdefault(df, {})
+    if "schema" not in cached:
+        cached["schema"] = df.schema
+        cached["columns"] = cached["schema"].names
+
+    return cached["schema"]
+
+
+def _seed_columns(df, columns: Optional[List[str]]):
+    if columns is not None:
+        _SCHEMA_CACHE.setdefault(df, {})["columns"] = [_format_col_name(col) for col in columns]
+
+    return df
+
+
+def _derive_columns(df, new_cols: List[str], drop_cols: Optional[List[str]] = None) -> Optional[List[str]]:
+    # Columns of df after with_columns and drop, without any describe query. None if the columns of df are not known.
+    # Same as Snowpark, existing columns that are replaced are moved to the end
+    parent_cols = _SCHEMA_CACHE.get(df, {}).get("columns")
+    if parent_cols is None:
+        return None
+
+    replaced = set([_normalize_col_name(col) for col in new_cols])
+    dropped = set([_normalize_col_name(col) for col in drop_cols or []])
+    columns = [col for col in parent_cols if _normalize_col_name(col) not in replaced]
+    columns.extend(new_cols)
+
+    return [col for col in columns if _normalize_col_name(col) not in dropped]
+
+
+def _with_columns(df, new_cols: List[str], col_exprs: List, drop_cols: Optional[List[str]] = None):
+    ret_df = df.with_columns(new_cols, col_exprs)
+    if drop_cols:
+        ret_df = ret_df.drop(drop_cols)
+
+    return _seed_columns(ret_df, _derive_columns(df, new_cols, drop_cols))
+
+
 def _columns_in_dataframe(columns, df):
-    df_columns = set(df.columns)
-    needed_cols = set([col.upper() for col in columns])
+    df_columns = set([_normalize_col_name(col) for col in _get_columns(df)])
+    needed_cols = set([_normalize_col_name(col) for col in columns])
 
     required_cols_not_present = needed_cols - df_columns
     if len(required_cols_not_present):
@@ -48,3 +105,29 @@ def _generate_udf_encoder(encoder):
             udf_encoder["unknown_value"] = encoder.unknown_value
 
     return udf_encoder
+
+
+def _collect_fitted_values(df, obj_const_log) -> dict:
+    # Run the aggregations as one single row query and return the result as a dict
+    if not obj_const_log:
+        return {}
+
+    df_fitted_values = df.select(F.object_construct(*obj_const_log))
+    return json.loads(df_fitted_values.collect()[0][0])
+
+
+def _normalize_col_name(name: str) -> str:
+    # Same rules as Snowflake identifiers, quoted names keep their case and unquoted are upper case
+    if len(name) > 1 and name.startswith('"') and name.endswith('"'):
+        return name[1:-1].replace('""', '"')
+    if re.match(r"^[A-Za-z_][A-Za-z0-9_$]*$", name):
+        return name.upper()
+    return name
+
+
+def _format_col_name(name: str) -> str:
+    # Name as returned by DataFrame.columns
+    normalized = _normalize_col_name(name)
+    if re.match(r"^[A-Z_][A-Z0-9_$]*$", normalized):
+        return normalized
+    return '"' + normalized.replace('"', '""') + '"'
@@ -0,0 +1,352 @@
+"""
+Benchmarks for the SQL generated by the transformers and for the model scoring strategies.
+
+For each transformer and number of columns/categories the size and nesting depth of the generated SQL, the time to
+generate it in Python, the time for Snowflake to compile it with EXPLAIN and the time to transform a batch of rows are
+measured. The SQL is only generated by Snowflake sessions:
+
+    preprocessing.benchmarks.run_benchmarks(session)
+
+Snowpark local testing does not generate SQL, so without a Snowflake session only the transform times are measured,
+with the local backend only or also against local testing mode:
+
+    python -m preprocessing.benchmarks --local-testing
+
+The scoring strategies used in the notebooks, scalar and vectorized UDFs with and without a cached model, are compared
+with a local simulation of how Snowflake calls the UDFs:
+
+    python -m preprocessing.benchmarks --scoring
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ._scalers import MinMaxScaler, StandardScaler, MaxAbsScaler, RobustScaler, Normalizer, Binarizer
+from ._encoders import OneHotEncoder, OrdinalEncoder, HashingEncoder
+from . import scoring
+
+__all__ = [
+    "run_benchmarks",
+    "benchmark_transformer",
+    "run_scoring_benchmarks",
+]
+
+# name: function returning an unfitted transformer given the input columns and the categories
+_SCALERS = {
+    "MinMaxScaler": lambda cols, cats: MinMaxScaler(input_cols=cols),
+    "StandardScaler": lambda cols, cats: StandardScaler(input_cols=cols),
+    "MaxAbsScaler": lambda cols, cats: MaxAbsScaler(input_cols=cols),
+    "RobustScaler": lambda cols, cats: RobustScaler(input_cols=cols),
+    "Normalizer": lambda cols, cats: Normalizer(input_cols=cols),
+    "Binarizer": lambda cols, cats: Binarizer(input_cols=cols),
+}
+_ENCODERS = {
+    "OneHotEncoder": lambda cols, cats: OneHotEncoder(input_cols=cols, categories=cats),
+    "OneHotEncoder(sparse)": lambda cols, cats: OneHotEncoder(input_cols=cols, categories=cats, output="sparse"),
+    "OrdinalEncoder(case)": lambda cols, cats: OrdinalEncoder(input_cols=cols, categories=cats, strategy="case"),
+    "OrdinalEncoder(join)": lambda cols, cats: OrdinalEncoder(input_cols=cols, categories=cats, strategy="join"),
+    "HashingEncoder": lambda cols, cats: HashingEncoder(input_cols=cols, n_features=32),
+}
+# name: SQL function used by the transformer that Snowpark local testing does not implement
+_LOCAL_TESTING_UNSUPPORTED = {
+    "Normalizer": "SQUARE",
+    "OneHotEncoder(sparse)": "ARRAY_CONSTRUCT_COMPACT",
+    "HashingEncoder": "MD5_NUMBER_LOWER64",
+}
+
+
+def _sql_depth(sql: str) -> int:
+    # Deepest nesting of parentheses outside of string literals, the nesting of the generated expressions
+    depth = max_depth = 0
+    in_string = False
+    for char in sql:
+        if char == "'":
+            in_string = not in_string
+        elif not in_string and char == "(":
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif not in_string and char == ")":
+            depth -= 1
+
+    return max_depth
+
+
+def _renders_sql(session) -> bool:
+    # Local testing sessions does not generate SQL, Session.sql raises NotImplementedError for them
+    try:
+        session.sql("SELECT 1")
+    except NotImplementedError:
+        return False
+    return True
+
+
+def _generate_data(nbr_rows: int, nbr_columns: int, nbr_categories: Optional[int], seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    if nbr_categories is None:
+        return pd.DataFrame(rng.normal(size=(nbr_rows, nbr_columns)), columns=[f"X{i}" for i in range(nbr_columns)])
+
+    codes = rng.integers(0, nbr_categories, size=(nbr_rows, nbr_columns))
+    return pd.DataFrame({f"C{i}": [f"cat_{code}" for code in codes[:, i]] for i in range(nbr_columns)})
+
+
+def _check_measure_sql(session, measure_sql: bool):
+    if measure_sql and (session is None or not _renders_sql(session)):
+        raise ValueError("The generated SQL can only be measured with a Snowflake session, Snowpark local testing "
+                         "does not generate SQL. Use measure_sql=False to only measure the transform times")
+
+
+def benchmark_transformer(make_transformer: Callable, nbr_columns: int, nbr_categories: Optional[int] = None,
+                          nbr_rows: int = 1000, session=None, seed: int = 0, measure_sql: bool = True) -> Dict:
+    """
+    Benchmark one transformer.
+
+    The transformer is fitted with the local backend on generated data. The SQL of the transformed DataFrame is
+    generated by session, sql_generation_time is the time to generate it in Python and compile_time the time of
+    EXPLAIN on it in Snowflake. Local testing sessions does not generate SQL, then measure_sql needs to be False and
+    only the transform times are measured.
+
+    :param make_transformer: Function taking the input columns and a dict of categories, returning a transformer
+    :param nbr_columns: Number of input columns
+    :param nbr_categories: Number of categories per input column, None for numeric columns
+    :param nbr_rows: Number of rows used for the transform time
+    :param session: Snowpark Session, real or local testing, used for the SQL and the Snowpark transform time. Only
+                    needed for the local transform time when measure_sql is False
+    :param seed: Seed for the generated data
+    :param measure_sql: If True the generated SQL is measured, which needs a Snowflake session
+    :return: Dictionary with the measures
+    """
+    _check_measure_sql(session, measure_sql)
+
+    pdf = _generate_data(nbr_rows, nbr_columns, nbr_categories, seed)
+    input_cols = list(pdf.columns)
+    categories = None
+    if nbr_categories is not None:
+        categories = {col: sorted(f"cat_{code}" for code in range(nbr_categories)) for col in input_cols}
+
+    result = {"nbr_columns": nbr_columns, "nbr_categories": nbr_categories, "nbr_rows": nbr_rows}
+    transformer = make_transformer(input_cols, categories)
+    transformer.fit(pdf)
+
+    if measure_sql:
+        sql_df = session.create_dataframe(pdf.head(1))
+        # Time to build the transformed DataFrame and generate its SQL in Python
+        start = time.perf_counter()
+        sql = transformer.transform(sql_df).queries["queries"][-1]
+        result["sql_generation_time"] = time.perf_counter() - start
+        result["sql_length"] = len(sql)
+        result["sql_depth"] = _sql_depth(sql)
+
+        # EXPLAIN compiles the query in Snowflake without running it
+        start = time.perf_counter()
+        session.sql(f"EXPLAIN USING TEXT {sql}").collect()
+        result["compile_time"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    transformer.transform(pdf)
+    result["local_transform_time"] = time.perf_counter() - start
+
+    if session is not None:
+        df = session.create_dataframe(pdf)
+        start = time.perf_counter()
+        transformer.transform(df).collect()
+        result["snowpark_transform_time"] = time.perf_counter() - start
+
+    return result
+
+
+def run_benchmarks(session=None, columns: List[int] = (10, 100, 1000),
+                   categories: List[int] = (10, 100, 1000, 10000), nbr_rows: int = 1000,
+                   transformers: Optional[List[str]] = None, seed: int = 0, measure_sql: bool = True) -> pd.DataFrame:
+    """
+    Run the benchmarks for all scalers and encoders.
+
+    Scalers are run for each number of columns. Encoders are run for each number of columns with 10 categories and
+    for each number of categories with one column. With a local testing session the transformers using SQL functions
+    that local testing does not implement are not run, they get one row with the function in the column unsupported.
+
+    :param session: Snowpark Session, real or local testing, used for the SQL and the Snowpark transform time. Only
+                    needed for the local transform time when measure_sql is False
+    :param columns: Number of columns to benchmark
+    :param categories: Number of categories to benchmark
+    :param nbr_rows: Number of rows used for the transform time
+    :param transformers: Names of the transformers to benchmark, default is all
+    :param seed: Seed for the generated data
+    :param measure_sql: If True the generated SQL is measured, which needs a Snowflake session
+    :return: Pandas DataFrame with one row per transformer and size
+    """
+    _check_measure_sql(session, measure_sql)
+    local_testing = session is not None and not _renders_sql(session)
+
+    results = []
+    for name, make_transformer in {**_SCALERS, **_ENCODERS}.items():
+        if transformers is not None and name not in transformers:
+            continue
+        if local_testing and name in _LOCAL_TESTING_UNSUPPORTED:
+            results.append({"transformer": name, "unsupported": f"{_LOCAL_TESTING_UNSUPPORTED[name]} is not "
+                                                                f"implemented by Snowpark local testing"})
+            continue
+
+        if name in _SCALERS:
+            sizes = [(nbr_columns, None) for nbr_columns in columns]
+        else:
+            sizes = [(nbr_columns, 10) for nbr_columns in columns] + [(1, nbr_cats) for nbr_cats in categories]
+        for nbr_columns, nbr_categories in sizes:
+            results.append({"transformer": name, **benchmark_transformer(
+                make_transformer, nbr_columns, nbr_categories, nbr_rows, session, seed, measure_sql)})
+
+    return pd.DataFrame(results)
+
+
+def _train_benchmark_model(path: str, nbr_features: int, seed: int = 0):
+    from joblib import dump
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(1000, nbr_features))
+    y = (X.sum(axis=1) > 0).astype(np.int64)
+    dump(LogisticRegression().fit(X, y), path)
+
+
+def _get_scoring_strategies(model_path: str, feature_cols: List[str], loads: Dict) -> Dict:
+    # name: (function called by the simulated UDF, True if it is called with batches and False with single rows)
+    def load_model():
+        from joblib import load
+        loads["count"] += 1
+        return load(model_path)
+
+    def get_cached_model():
+        if model_path not in scoring._MODEL_CACHE:
+            loads["count"] += 1
+        return scoring._get_model(model_path)
+
+    def score_scalar(*args):
+        return load_model().predict(np.array([args], dtype=np.float64))[0]
+
+    def score_scalar_cached(*args):
+        return get_cached_model().predict(np.array([args], dtype=np.float64))[0]
+
+    def score_vectorized(df: pd.DataFrame) -> pd.Series:
+        return pd.Series(load_model().predict(df.to_numpy(dtype=np.float64)))
+
+    vectorized_cached = scoring.make_score_function(model_path, feature_cols)
+
+    def score_vectorized_cached(df: pd.DataFrame) -> pd.Series:
+        get_cached_model()
+        return vectorized_cached(df)
+
+    return {
+        "scalar": (score_scalar, False),
+        "scalar_cached": (score_scalar_cached, False),
+        "vectorized": (score_vectorized, True),
+        "vectorized_cached": (score_vectorized_cached, True),
+    }
+
+
+def _simulate_udf(func: Callable, vectorized: bool, pdf: pd.DataFrame, batch_size: int) -> int:
+    # Snowflake calls vectorized UDFs with batches of at most max_batch_size rows, with the columns by position
+    nbr_batches = 0
+    for start in range(0, len(pdf), batch_size):
+        batch = pdf.iloc[start:start + batch_size].set_axis(range(pdf.shape[1]), axis=1)
+        if vectorized:
+            func(batch)
+        else:
+            for row in batch.itertuples(index=False):
+                func(*row)
+        nbr_batches += 1
+
+    return nbr_batches
+
+
+def run_scoring_benchmarks(model_path: Optional[str] = None, nbr_features: int = 20,
+                           rows: List[int] = (1000, 10000, 100000), batch_sizes: List[int] = (100, 1000, 10000),
+                           max_scalar_rows: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    Compare the scoring strategies of the notebooks with a local simulation of the UDF calls.
+
+    Snowpark local testing calls vectorized UDFs one row at a time, so the batching of Snowflake is simulated by
+    splitting the rows in batches of max_batch_size. Each strategy starts with an empty model cache, as a new UDF
+    process. The local baseline scores all rows with one predict call on a loaded model.
+
+    :param model_path: Local path to a model saved with joblib, if not provided a LogisticRegression is trained
+    :param nbr_features: Number of features, needs to match the model if model_path is provided
+    :param rows: Number of rows to score
+    :param batch_sizes: Batch sizes, ie max_batch_size of the vectorized UDFs
+    :param max_scalar_rows: Maximum number of rows scored with the scalar strategies, that loads the model per row
+                            without a cache. rows_per_sec is calculated on the rows scored
+    :param seed: Seed for the generated data
+    :return: Pandas DataFrame with strategy, rows, batch_size, nbr_batches, seconds, rows_per_sec, model_loads and
+             batch_overhead, the seconds per batch above the local baseline
+    """
+    feature_cols = [f"X{i}" for i in range(nbr_features)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if model_path is None:
+            model_path = os.path.join(tmp_dir, "benchmark_model.sav")
+            _train_benchmark_model(model_path, nbr_features, seed)
+
+        from joblib import load
+        model = load(model_path)
+        loads = {"count": 0}
+        strategies = _get_scoring_strategies(model_path, feature_cols, loads)
+        rng = np.random.default_rng(seed)
+
+        results = []
+        for nbr_rows in rows:
+            pdf = pd.DataFrame(rng.normal(size=(nbr_rows, nbr_features)), columns=feature_cols)
+
+            start = time.perf_counter()
+            model.predict(pdf.to_numpy(dtype=np.float64))
+            baseline = time.perf_counter() - start
+            results.append({"strategy": "local_pandas", "rows": nbr_rows, "batch_size": nbr_rows, "nbr_batches": 1,
+                            "seconds": baseline, "rows_per_sec": nbr_rows / baseline, "model_loads": 1,
+                            "batch_overhead": 0.0})
+
+            for name, (func, vectorized) in strategies.items():
+                # Scalar UDFs are called with one row at a time regardless of the batch size
+                scored_rows = nbr_rows if vectorized else min(nbr_rows, max_scalar_rows)
+                for batch_size in batch_sizes if vectorized else [batch_sizes[0]]:
+                    scoring._MODEL_CACHE.clear()
+                    loads["count"] = 0
+
+                    start = time.perf_counter()
+                    nbr_batches = _simulate_udf(func, vectorized, pdf.iloc[:scored_rows], batch_size)
+                    seconds = time.perf_counter() - start
+
+                    results.append({
+                        "strategy": name, "rows": scored_rows, "batch_size": batch_size if vectorized else 1,
+                        "nbr_batches": nbr_batches if vectorized else scored_rows, "seconds": seconds,
+                        "rows_per_sec": scored_rows / seconds, "model_loads": loads["count"],
+                        "batch_overhead": (seconds - baseline * scored_rows / nbr_rows) /
+                                          (nbr_batches if vectorized else scored_rows),
+                    })
+
+        scoring._MODEL_CACHE.clear()
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SQL generated by the preprocessing transformers")
+    parser.add_argument("--local-testing", action="store_true", help="Use a Snowpark local testing session")
+    parser.add_argument("--scoring", action="store_true", help="Benchmark the scoring strategies instead")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000], help="Number of rows to transform or score")
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--categories", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+        if args.scoring:
+            print(run_scoring_benchmarks(rows=args.rows, batch_sizes=args.batch_sizes))
+        else:
+            bench_session = None
+            if args.local_testing:
+                from snowflake.snowpark import Session
+                bench_session = Session.builder.config("local_testing", True).create()
+            # Sessions created here does not generate SQL, run_benchmarks needs a Snowflake session for it
+            print(pd.concat([run_benchmarks(bench_session, args.columns, args.categories, nbr_rows, measure_sql=False)
+                             for nbr_rows in args.rows], ignore_index=True))
@@ -0,0 +1,282 @@
+"""
+Metrics for binary classification calculated in Snowflake.
+
+All metrics are derived from the confusion matrix, that is calculated with conditional sums in one aggregation, so
+each call scans the scored table once regardless of the number of metrics, thresholds or segments. ROC and
+precision-recall curves are calculated from bucketed scores, so only one row per bucket is returned.
+"""
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from snowflake.snowpark import DataFrame
+import snowflake.snowpark.functions as F
+from snowflake.snowpark import Window
+
+from ._local import _is_local_df, _to_pandas
+
+__all__ = [
+    "confusion_matrix",
+    "classification_metrics",
+    "threshold_metrics",
+    "roc_pr_curve",
+    "accuracy_score",
+    "precision_score",
+    "recall_score",
+    "f1_score",
+]
+
+_CONFUSION_COLS = ["TN", "FP", "FN", "TP"]
+
+
+def _get_confusion_exprs(y_true: str, y_pred: str, threshold: Optional[float] = None, suffix: str = "") -> List:
+    # Rows with a missing label or prediction are not counted
+    actual = F.col(y_true) == F.lit(1)
+    predicted = F.col(y_pred) >= F.lit(threshold) if threshold is not None else F.col(y_pred) == F.lit(1)
+
+    conditions = [~actual & ~predicted, ~actual & predicted, actual & ~predicted, actual & predicted]
+
+    return [F.sum(F.iff(condition, F.lit(1), F.lit(0))).as_(name + suffix)
+            for name, condition in zip(_CONFUSION_COLS, conditions)]
+
+
+def _get_local_confusion(pdf: pd.DataFrame, y_true: str, y_pred: str, threshold: Optional[float] = None) -> List:
+    actual = pdf[y_true] == 1
+    predicted = pdf[y_pred] >= threshold if threshold is not None else pdf[y_pred] == 1
+    valid = pdf[y_true].notna() & pdf[y_pred].notna()
+
+    conditions = [~actual & ~predicted, ~actual & predicted, actual & ~predicted, actual & predicted]
+
+    return [int((condition & valid).sum()) for condition in conditions]
+
+
+def _add_metrics(pdf: pd.DataFrame) -> pd.DataFrame:
+    # Metrics with a zero denominator are set to 0, as zero_division=0 in scikit-learn
+    def divide(numerator, denominator):
+        numerator = numerator.astype(np.float64)
+        denominator = denominator.astype(np.float64)
+        return np.divide(numerator, denominator, out=np.zeros(len(pdf)), where=denominator != 0)
+
+    tn, fp, fn, tp = [pdf[col] for col in _CONFUSION_COLS]
+    pdf["ACCURACY"] = divide(tp + tn, tp + tn + fp + fn)
+    pdf["PRECISION"] = divide(tp, tp + fp)
+    pdf["RECALL"] = divide(tp, tp + fn)
+    pdf["F1"] = divide(2 * tp, 2 * tp + fp + fn)
+
+    return pdf
+
+
+def classification_metrics(df: Union[DataFrame, pd.DataFrame], y_true: str, y_pred: str,
+                           threshold: Optional[float] = None,
+                           segment_cols: Optional[Union[List[str], str]] = None) -> pd.DataFrame:
+    """
+    Calculate the confusion matrix, accuracy, precision, recall and F1 with one query.
+
+    :param df: Snowpark DataFrame with the labels and predictions, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_pred: Column with the predicted labels, or the predicted probabilities if threshold is provided
+    :param threshold: If provided a prediction is positive if y_pred is greater than or equal to threshold
+    :param segment_cols: Optional column or columns to calculate the metrics per segment
+    :return: Pandas DataFrame with the segment columns, TN, FP, FN, TP, ACCURACY, PRECISION, RECALL and F1, with one
+             row per segment
+    """
+    if isinstance(segment_cols, str):
+        segment_cols = [segment_cols]
+
+    if _is_local_df(df):
+        pdf = _to_pandas(df)
+        groups = pdf.groupby(segment_cols, sort=True, dropna=False) if segment_cols else [((), pdf)]
+        rows = []
+        for key, group in groups:
+            key = key if isinstance(key, tuple) else (key,)
+            rows.append(list(key) + _get_local_confusion(group, y_true, y_pred, threshold))
+        result = pd.DataFrame(rows, columns=(segment_cols or []) + _CONFUSION_COLS)
+    else:
+        confusion_exprs = _get_confusion_exprs(y_true, y_pred, threshold)
+        if segment_cols:
+            result = df.group_by(segment_cols).agg(confusion_exprs).sort(segment_cols).to_pandas()
+        else:
+            result = df.agg(confusion_exprs).to_pandas()
+        # An empty DataFrame sums to NULL
+        result[_CONFUSION_COLS] = result[_CONFUSION_COLS].fillna(0).astype(np.int64)
+
+    return _add_metrics(result)
+
+
+def confusion_matrix(df: Union[DataFrame, pd.DataFrame], y_true: str, y_pred: str,
+                     threshold: Optional[float] = None) -> List[List[int]]:
+    """
+    Calculate the confusion matrix with one query.
+
+    :param df: Snowpark DataFrame with the labels and predictions, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_pred: Column with the predicted labels, or the predicted probabilities if threshold is provided
+    :param threshold: If provided a prediction is positive if y_pred is greater than or equal to threshold
+    :return: [[TN, FP], [FN, TP]]
+    """
+    row = classification_metrics(df, y_true, y_pred, threshold).iloc[0]
+
+    return [[int(row["TN"]), int(row["FP"])], [int(row["FN"]), int(row["TP"])]]
+
+
+def threshold_metrics(df: Union[DataFrame, pd.DataFrame], y_true: str, y_score: str,
+                      thresholds: List[float]) -> pd.DataFrame:
+    """
+    Calculate the confusion matrix and metrics for each threshold with one query.
+
+    :param df: Snowpark DataFrame with the labels and scores, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_score: Column with the predicted probabilities of the positive class
+    :param thresholds: Thresholds to use, a prediction is positive if y_score is greater than or equal to threshold
+    :return: Pandas DataFrame with THRESHOLD, TN, FP, FN, TP, ACCURACY, PRECISION, RECALL and F1, one row per threshold
+    """
+    if len(thresholds) == 0:
+        raise ValueError("At least one threshold is needed")
+
+    if _is_local_df(df):
+        pdf = _to_pandas(df)
+        rows = [[threshold] + _get_local_confusion(pdf, y_true, y_score, threshold) for threshold in thresholds]
+    else:
+        confusion_exprs = []
+        for idx, threshold in enumerate(thresholds):
+            confusion_exprs.extend(_get_confusion_exprs(y_true, y_score, threshold, f"_{idx}"))
+        counts = df.agg(confusion_exprs).collect()[0].as_dict()
+        rows = [[threshold] + [int(counts[f"{col}_{idx}"] or 0) for col in _CONFUSION_COLS]
+                for idx, threshold in enumerate(thresholds)]
+
+    return _add_metrics(pd.DataFrame(rows, columns=["THRESHOLD"] + _CONFUSION_COLS))
+
+
+def _get_bucket_counts(df: Union[DataFrame, pd.DataFrame], y_true: str, y_score: str, nbr_buckets: int,
+                       min_score: float, max_score: float) -> pd.DataFrame:
+    # Number of positives and negatives with a score at or above the lower edge of each bucket
+    if _is_local_df(df):
+        pdf = _to_pandas(df)
+        pdf = pdf[pdf[y_true].notna() & pdf[y_score].notna()]
+        width = (max_score - min_score) / nbr_buckets
+        buckets = np.clip(np.floor((pdf[y_score].to_numpy(dtype=np.float64) - min_score) / width) + 1, 1, nbr_buckets)
+        counts = pd.DataFrame({"BUCKET": buckets.astype(np.int64), "POS": (pdf[y_true] == 1).to_numpy(dtype=np.int64),
+                               "NEG": (pdf[y_true] != 1).to_numpy(dtype=np.int64)})
+        counts = counts.groupby("BUCKET", as_index=False).sum().sort_values("BUCKET", ascending=False)
+        counts["TP"] = counts["POS"].cumsum()
+        counts["FP"] = counts["NEG"].cumsum()
+        return counts[["BUCKET", "TP", "FP"]]
+
+    # Scores outside of the range are put in the first or last bucket
+    bucket = F.least(F.greatest(F.width_bucket(F.col(y_score), F.lit(min_score), F.lit(max_score),
+                                               F.lit(nbr_buckets)), F.lit(1)), F.lit(nbr_buckets))
+    actual = F.col(y_true) == F.lit(1)
+    counts_df = df.filter(F.col(y_true).is_not_null() & F.col(y_score).is_not_null()) \
+        .group_by(bucket.as_("BUCKET")) \
+        .agg([F.sum(F.iff(actual, F.lit(1), F.lit(0))).as_("POS"), F.sum(F.iff(actual, F.lit(0), F.lit(1))).as_("NEG")])
+
+    cumulative = Window.order_by(F.col("BUCKET").desc()).rows_between(Window.UNBOUNDED_PRECEDING, Window.CURRENT_ROW)
+    counts = counts_df.select(F.col("BUCKET"), F.sum(F.col("POS")).over(cumulative).as_("TP"),
+                              F.sum(F.col("NEG")).over(cumulative).as_("FP")).to_pandas()
+
+    return counts.astype(np.int64).sort_values("BUCKET", ascending=False)
+
+
+def roc_pr_curve(df: Union[DataFrame, pd.DataFrame], y_true: str, y_score: str, nbr_buckets: int = 100,
+                 min_score: float = 0.0, max_score: float = 1.0) -> Tuple[pd.DataFrame, float, float]:
+    """
+    Calculate the ROC and precision-recall curves for a score column, with the scores bucketed in Snowflake.
+
+    The scores are bucketed with WIDTH_BUCKET and the true and false positives for each threshold are calculated with
+    cumulative sums over the buckets, so only one row per bucket is returned regardless of the number of rows in df.
+
+    :param df: Snowpark DataFrame with the labels and scores, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_score: Column with the predicted probabilities of the positive class
+    :param nbr_buckets: Number of buckets, the thresholds are the lower edge of each bucket
+    :param min_score: Lowest score, lower scores are put in the first bucket
+    :param max_score: Highest score, higher scores are put in the last bucket
+    :return: Tuple with a pandas DataFrame with THRESHOLD, TP, FP, FN, TN, TPR, FPR and PRECISION ordered by decreasing
+             threshold, the area under the ROC curve and the average precision
+    """
+    if nbr_buckets < 1:
+        raise ValueError("nbr_buckets needs to be at least 1")
+    if not max_score > min_score:
+        raise ValueError("max_score needs to be greater than min_score")
+
+    counts = _get_bucket_counts(df, y_true, y_score, nbr_buckets, min_score, max_score)
+
+    # Buckets without any scores have the same counts as the bucket above them
+    all_buckets = np.arange(nbr_buckets, 0, -1)
+    curve = counts.set_index("BUCKET").reindex(all_buckets).ffill().fillna(0).astype(np.int64).reset_index()
+    curve.insert(0, "THRESHOLD", min_score + (curve["BUCKET"] - 1) * (max_score - min_score) / nbr_buckets)
+    curve = curve.drop(columns="BUCKET")
+
+    nbr_pos = int(curve["TP"].iloc[-1])
+    nbr_neg = int(curve["FP"].iloc[-1])
+    curve["FN"] = nbr_pos - curve["TP"]
+    curve["TN"] = nbr_neg - curve["FP"]
+    curve["TPR"] = curve["TP"] / nbr_pos if nbr_pos else 0.0
+    curve["FPR"] = curve["FP"] / nbr_neg if nbr_neg else 0.0
+    predicted_pos = curve["TP"] + curve["FP"]
+    curve["PRECISION"] = np.divide(curve["TP"], predicted_pos, out=np.ones(len(curve)), where=predicted_pos != 0)
+
+    # Trapezoidal ROC AUC starting at (0, 0) and the step-wise average precision as in scikit-learn
+    tpr = np.concatenate([[0.0], curve["TPR"].to_numpy(dtype=np.float64)])
+    fpr = np.concatenate([[0.0], curve["FPR"].to_numpy(dtype=np.float64)])
+    roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+    average_precision = float(np.sum(np.diff(tpr) * curve["PRECISION"].to_numpy(dtype=np.float64)))
+
+    return curve, roc_auc, average_precision
+
+
+def accuracy_score(df: Union[DataFrame, pd.DataFrame], y_true: str, y_pred: str,
+                   threshold: Optional[float] = None) -> float:
+    """
+    Accuracy, use classification_metrics to get all metrics with one query.
+
+    :param df: Snowpark DataFrame with the labels and predictions, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_pred: Column with the predicted labels, or the predicted probabilities if threshold is provided
+    :param threshold: If provided a prediction is positive if y_pred is greater than or equal to threshold
+    :return: Accuracy
+    """
+    return float(classification_metrics(df, y_true, y_pred, threshold)["ACCURACY"].iloc[0])
+
+
+def precision_score(df: Union[DataFrame, pd.DataFrame], y_true: str, y_pred: str,
+                    threshold: Optional[float] = None) -> float:
+    """
+    Precision, use classification_metrics to get all metrics with one query.
+
+    :param df: Snowpark DataFrame with the labels and predictions, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_pred: Column with the predicted labels, or the predicted probabilities if threshold is provided
+    :param threshold: If provided a prediction is positive if y_pred is greater than or equal to threshold
+    :return: Precision
+    """
+    return float(classification_metrics(df, y_true, y_pred, threshold)["PRECISION"].iloc[0])
+
+
+def recall_score(df: Union[DataFrame, pd.DataFrame], y_true: str, y_pred: str,
+                 threshold: Optional[float] = None) -> float:
+    """
+    Recall, use classification_metrics to get all metrics with one query.
+
+    :param df: Snowpark DataFrame with the labels and predictions, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_pred: Column with the predicted labels, or the predicted probabilities if threshold is provided
+    :param threshold: If provided a prediction is positive if y_pred is greater than or equal to threshold
+    :return: Recall
+    """
+    return float(classification_metrics(df, y_true, y_pred, threshold)["RECALL"].iloc[0])
+
+
+def f1_score(df: Union[DataFrame, pd.DataFrame], y_true: str, y_pred: str,
+             threshold: Optional[float] = None) -> float:
+    """
+    F1 score, use classification_metrics to get all metrics with one query.
+
+    :param df: Snowpark DataFrame with the labels and predictions, a pandas DataFrame is calculated locally
+    :param y_true: Column with the true labels, 1 is the positive class
+    :param y_pred: Column with the predicted labels, or the predicted probabilities if threshold is provided
+    :param threshold: If provided a prediction is positive if y_pred is greater than or equal to threshold
+    :return: F1 score
+    """
+    return float(classification_metrics(df, y_true, y_pred, threshold)["F1"].iloc[0])
@@ -0,0 +1,94 @@
+"""
+Splitting of Snowpark DataFrames into train and test sets.
+
+The split label is assigned from a deterministic hash of each row in one projection, so the source table is scanned
+once and the splits are read from a single labeled table.
+"""
+from typing import List, Optional
+
+import snowflake.snowpark.functions as F
+from snowflake.snowpark import DataFrame
+from snowflake.snowpark import Window
+
+from ._utilities import _get_columns, _seed_columns
+
+__all__ = [
+    "stratified_split",
+]
+
+_SPLIT_COL = "SPLIT__"
+_NBR_BUCKETS = 1000000
+
+
+def _get_bounds(ratios: List[float]) -> List[float]:
+    # Cumulative fraction of rows at the end of each split but the last
+    total = float(sum(ratios))
+    bounds = []
+    cumulative = 0.0
+    for ratio in ratios[:-1]:
+        cumulative += ratio
+        bounds.append(cumulative / total)
+
+    return bounds
+
+
+def _get_split_expr(df: DataFrame, target: str, ratios: List[float], seed: int, exact: bool):
+    # Identical rows get the same hash, so the content of the splits does not depend on the order of the rows
+    row_hash = F.hash(F.lit(seed), *[F.col(col) for col in _get_columns(df)])
+
+    if exact:
+        # The rows of each class are ordered by the hash, the position within the class decides the split
+        position = F.row_number().over(Window.partition_by(target).order_by(row_hash))
+        class_rows = F.count(F.lit(1)).over(Window.partition_by(target))
+        conditions = [position <= class_rows * F.lit(bound) for bound in _get_bounds(ratios)]
+    else:
+        # The hash is independent of the target, so the split is not stratified, each class is only split in the
+        # ratios in expectation
+        bucket = F.abs(row_hash) % F.lit(_NBR_BUCKETS)
+        conditions = [bucket < F.lit(int(round(bound * _NBR_BUCKETS))) for bound in _get_bounds(ratios)]
+
+    split_expr = F.lit(len(ratios) - 1)
+    for idx in reversed(range(len(conditions))):
+        split_expr = F.when(conditions[idx], F.lit(idx)).otherwise(split_expr)
+
+    return split_expr
+
+
+def stratified_split(df: DataFrame, target: str, ratios: List[float], seed: int = 0,
+                     table_name: Optional[str] = None, exact: bool = True) -> List[DataFrame]:
+    """
+    Split a DataFrame keeping the proportion of each target class in every split.
+
+    The rows of each class are ordered by a hash of the row and the seed and divided at the given ratios, so the same
+    data and seed always gives the same splits. The labeled rows are written once, to table_name or a temporary table
+    with cache_result, and each split is a filter on that table.
+
+    With exact=False the rows are not sorted, each row is assigned to a split from its hash alone. That split does not
+    use the target and is not stratified, the proportion of a class in each split only matches the ratios in
+    expectation and can differ for small or rare classes.
+
+    :param df: Snowpark DataFrame to split
+    :param target: Column with the classes to stratify on, not used when exact is False
+    :param ratios: Relative size of each split, ie [0.8, 0.2], normalized if they do not sum to 1
+    :param seed: Seed of the hash, different seeds give different splits
+    :param table_name: Optional table to save the labeled rows to, with the split index in the column SPLIT__
+    :param exact: If True each class is split at the ratios using window functions, which sorts each class. If
+                  False a random split without sorting is done, which is not stratified
+    :return: List of DataFrames, one per ratio, with the same columns as df
+    """
+    if len(ratios) < 2:
+        raise ValueError("ratios needs at least two values")
+    if any(ratio <= 0 for ratio in ratios):
+        raise ValueError("ratios needs to be positive")
+
+    columns = _get_columns(df)
+    labeled_df = df.with_column(_SPLIT_COL, _get_split_expr(df, target, ratios, seed, exact))
+
+    if table_name:
+        labeled_df.write.save_as_table(table_name=table_name, mode="overwrite")
+        labeled_df = df.session.table(table_name)
+    else:
+        labeled_df = labeled_df.cache_result()
+
+    return [_seed_columns(labeled_df.filter(F.col(_SPLIT_COL) == F.lit(idx)).drop(_SPLIT_COL), columns)
+            for idx in range(len(ratios))]
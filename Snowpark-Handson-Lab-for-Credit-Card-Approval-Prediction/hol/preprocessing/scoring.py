@@ -0,0 +1,173 @@
+"""
+Scoring of models in vectorized UDFs.
+
+The model is loaded once per Python process and kept in a cache, fitted transformers can be applied to each batch
+before the model with the compiled udf_transform plans.
+"""
+from typing import Callable, Dict, List, Optional
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import snowflake.snowpark.functions as F
+from snowflake.snowpark import DataFrame, Session
+from snowflake.snowpark import types as T
+
+from ._udf import UdfTransformPlan
+from ._utilities import _get_schema, _normalize_col_name
+
+__all__ = [
+    "make_score_function",
+    "make_vectorized_scorer",
+]
+
+_IMPORT_DIRECTORY_NAME = "snowflake_import_directory"
+_DEFAULT_PACKAGES = ["pandas", "numpy", "scipy", "scikit-learn", "joblib"]
+
+# Loaded models per process, {path: model}
+_MODEL_CACHE = {}
+
+
+def _resolve_model_path(model_path: str) -> str:
+    # In a UDF the model is one of the imports, otherwise model_path is a local file
+    import_dir = sys._xoptions.get(_IMPORT_DIRECTORY_NAME)
+    if import_dir is not None:
+        return os.path.join(import_dir, os.path.basename(model_path))
+    if model_path.startswith("@"):
+        raise ValueError(f"Can not load {model_path} outside of a UDF, download it or use a local file")
+    return model_path
+
+
+def _get_model(model_path: str):
+    path = _resolve_model_path(model_path)
+    if path not in _MODEL_CACHE:
+        from joblib import load
+        _MODEL_CACHE[path] = load(path)
+
+    return _MODEL_CACHE[path]
+
+
+def _get_udf_encoders(preprocessors: Optional[List]) -> List[Dict]:
+    # Fitted transformers, pipelines or dictionaries returned by get_udf_encoder
+    udf_encoders = []
+    for preprocessor in preprocessors or []:
+        if isinstance(preprocessor, dict):
+            udf_encoders.append(preprocessor)
+        elif hasattr(preprocessor, "steps"):
+            udf_encoders.extend(_get_udf_encoders(preprocessor.steps))
+        else:
+            udf_encoders.append(preprocessor.get_udf_encoder())
+
+    return udf_encoders
+
+
+def _get_input_types(feature_cols: List[str], input_types: Optional[List[T.DataType]],
+                     df: Optional[DataFrame]) -> List[T.DataType]:
+    # String columns are needed by encoders fused before the model, so the types are taken from df when provided
+    if input_types is not None:
+        if len(input_types) != len(feature_cols):
+            raise ValueError(f"Got {len(input_types)} input_types for {len(feature_cols)} feature columns")
+        return list(input_types)
+    if df is None:
+        return [T.FloatType()] * len(feature_cols)
+
+    types = {_normalize_col_name(field.name): field.datatype for field in _get_schema(df).fields}
+    missing_cols = [col for col in feature_cols if _normalize_col_name(col) not in types]
+    if missing_cols:
+        raise ValueError(f"Cannot find columns {missing_cols} in the input dataframe")
+
+    return [types[_normalize_col_name(col)] for col in feature_cols]
+
+
+def make_score_function(model_path: str, feature_cols: List[str], preprocessors: Optional[List] = None,
+                        method: str = "predict", proba_class: int = 1,
+                        model_cols: Optional[List[str]] = None) -> Callable[[pd.DataFrame], pd.Series]:
+    """
+    Returns a function scoring a batch of rows, as used by make_vectorized_scorer.
+
+    The function can also be used to score pandas DataFrames locally, then model_path needs to be a local file.
+
+    :param model_path: Stage or local path to a model saved with joblib
+    :param feature_cols: Names of the input columns, in the order they are passed to the function
+    :param preprocessors: Optional fitted transformers, pipelines or get_udf_encoder dictionaries applied before the
+                          model in the order given
+    :param method: 'predict' or 'predict_proba'
+    :param proba_class: Index of the class returned when method is 'predict_proba'
+    :param model_cols: Columns passed to the model after the preprocessing, default is all columns
+    :return: Function taking a pandas DataFrame and returning a pandas Series with the scores
+    """
+    if method not in ("predict", "predict_proba"):
+        raise ValueError(f"method {method} is not supported, use 'predict' or 'predict_proba'")
+
+    # Column names as in pandas DataFrames returned by Snowpark, which are the names used by get_udf_encoder
+    col_names = [_normalize_col_name(col) for col in feature_cols]
+    model_col_names = [_normalize_col_name(col) for col in model_cols] if model_cols else None
+    udf_encoders = _get_udf_encoders(preprocessors)
+    # Compiled on the first batch of each process and used for all following batches
+    plan = None
+
+    def score(df: pd.DataFrame) -> pd.Series:
+        nonlocal plan
+        model = _get_model(model_path)
+
+        # Vectorized UDFs get the columns by position
+        df = df.set_axis(col_names, axis=1)
+        if udf_encoders:
+            if plan is None:
+                plan = UdfTransformPlan(udf_encoders)
+            df = plan.transform(df)
+        if model_col_names:
+            df = df[model_col_names]
+
+        # Models fitted on NumPy arrays warns if they get a DataFrame with column names
+        X = df if hasattr(model, "feature_names_in_") else df.to_numpy(dtype=np.float64)
+        if method == "predict_proba":
+            return pd.Series(model.predict_proba(X)[:, proba_class])
+
+        return pd.Series(model.predict(X))
+
+    return score
+
+
+def make_vectorized_scorer(model_path: str, feature_cols: List[str], preprocessors: Optional[List] = None, *,
+                           method: str = "predict", proba_class: int = 1, model_cols: Optional[List[str]] = None,
+                           session: Optional[Session] = None, name: Optional[str] = None,
+                           max_batch_size: Optional[int] = None, packages: Optional[List[str]] = None,
+                           imports: Optional[List] = None, input_types: Optional[List[T.DataType]] = None,
+                           df: Optional[DataFrame] = None, **kwargs):
+    """
+    Register a vectorized UDF that scores rows with a model saved with joblib.
+
+    The model is loaded once per Python process and cached for all following batches. The preprocessing package is
+    added as an import to the UDF so the cache and the compiled preprocessors are shared between batches.
+
+    :param model_path: Stage path, ie '@ML_MODELS/model.sav', or local path to a model saved with joblib
+    :param feature_cols: Names of the columns the UDF is called with, in the same order
+    :param preprocessors: Optional fitted transformers, pipelines or get_udf_encoder dictionaries applied before the
+                          model in the order given
+    :param method: 'predict' or 'predict_proba'
+    :param proba_class: Index of the class returned when method is 'predict_proba'
+    :param model_cols: Columns passed to the model after the preprocessing, default is all columns
+    :param session: Snowpark Session, if not provided the active session is used
+    :param name: Optional name of the UDF, a temporary UDF is created if not provided
+    :param max_batch_size: Maximum number of rows per batch
+    :param packages: Packages for the UDF, default is pandas, numpy, scipy, scikit-learn and joblib
+    :param imports: Additional imports for the UDF
+    :param input_types: Snowpark types of the feature columns, ie StringType for columns encoded by the preprocessors
+    :param df: DataFrame the UDF is used on, if provided and input_types is not the types are taken from its schema.
+               If neither is provided all feature columns are FLOAT
+    :param kwargs: Other arguments to session.udf.register, ie is_permanent, stage_location and replace
+    :return: UserDefinedFunction that is called with the feature columns
+    """
+    score = make_score_function(model_path, feature_cols, preprocessors, method, proba_class, model_cols)
+    types = _get_input_types(feature_cols, input_types, df)
+
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    udf_imports = [model_path, package_dir] + list(imports or [])
+
+    return F.pandas_udf(score, return_type=T.PandasSeriesType(T.FloatType()),
+                        input_types=[T.PandasDataFrameType(types)], name=name,
+                        imports=udf_imports, packages=packages or _DEFAULT_PACKAGES, max_batch_size=max_batch_size,
+                        session=session or (df.session if df is not None else None), **kwargs)
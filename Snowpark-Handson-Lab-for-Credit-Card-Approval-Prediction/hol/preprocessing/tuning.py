@@ -0,0 +1,215 @@
+"""
+Hyperparameter tuning with Optuna using all cores of the node.
+
+Trials run in a pool of processes that share one study through a journal file. The training data is copied once into
+shared memory and every process reads the same arrays. The cross-validation score is reported after each fold, so
+trials that are worse than the previous ones are pruned before all folds are fitted.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context, shared_memory
+from typing import Callable, Dict, Optional, Tuple, Union
+import os
+import shutil
+import tempfile
+import uuid
+
+import numpy as np
+
+__all__ = [
+    "tune_model",
+]
+
+_JOURNAL_FILE = "journal.log"
+
+# Per process state of the workers, set by _init_worker
+_WORKER = {}
+
+
+def _get_nbr_cores() -> int:
+    # Cores available to this process, which can be fewer than the cores of the node
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _get_journal_storage(path: str):
+    import optuna
+
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:
+        # Optuna before 4.0
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+
+    return optuna.storages.JournalStorage(JournalFileBackend(path))
+
+
+def _to_shared_memory(arr: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple]:
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _from_shared_memory(spec: Tuple) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    # The arrays are shared by all trials and processes
+    arr.flags.writeable = False
+
+    return shm, arr
+
+
+def _init_worker(x_spec: Tuple, y_spec: Tuple, suggest_model: Callable, settings: Dict):
+    # The shared memory objects are kept, the arrays are only valid while they are open
+    x_shm, X = _from_shared_memory(x_spec)
+    y_shm, y = _from_shared_memory(y_spec)
+    _WORKER.update({"shm": [x_shm, y_shm], "X": X, "y": y, "suggest_model": suggest_model, **settings})
+
+
+def _cross_validate(trial, model, X: np.ndarray, y: np.ndarray, cv, scoring: Optional[Union[str, Callable]]) -> float:
+    import optuna
+    from sklearn.base import clone, is_classifier
+    from sklearn.metrics import check_scoring
+    from sklearn.model_selection import check_cv
+
+    folds = check_cv(cv, y, classifier=is_classifier(model))
+    scorer = check_scoring(model, scoring=scoring)
+
+    scores = []
+    for step, (train_idx, test_idx) in enumerate(folds.split(X, y)):
+        fold_model = clone(model).fit(X[train_idx], y[train_idx])
+        scores.append(scorer(fold_model, X[test_idx], y[test_idx]))
+
+        # Mean of the folds so far, comparable between trials at the same step
+        trial.report(float(np.mean(scores)), step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+
+    return float(np.mean(scores))
+
+
+def _run_worker(nbr_trials: int, worker_idx: int) -> int:
+    import optuna
+
+    settings = _WORKER
+    seed = settings["seed"] + worker_idx if settings["seed"] is not None else None
+    sampler = settings["sampler"]
+    if sampler is None:
+        sampler = optuna.samplers.TPESampler(seed=seed)
+    elif hasattr(sampler, "reseed_rng"):
+        # The forked processes get copies of the sampler with the same random state, that would suggest the same
+        # parameters in every process
+        sampler.reseed_rng()
+    study = optuna.load_study(study_name=settings["study_name"], storage=_get_journal_storage(settings["storage_path"]),
+                              sampler=sampler, pruner=settings["pruner"])
+
+    def objective(trial):
+        model = settings["suggest_model"](trial)
+        return _cross_validate(trial, model, settings["X"], settings["y"], settings["cv"], settings["scoring"])
+
+    study.optimize(objective, n_trials=nbr_trials, timeout=settings["timeout"])
+
+    return nbr_trials
+
+
+def tune_model(X: np.ndarray, y: np.ndarray, suggest_model: Callable, n_trials: int = 100, *, cv=3,
+               scoring: Optional[Union[str, Callable]] = None, direction: str = "maximize",
+               n_jobs: Optional[int] = None, sampler=None, pruner=None, seed: Optional[int] = None,
+               timeout: Optional[float] = None, storage_path: Optional[str] = None,
+               study_name: Optional[str] = None, refit: bool = True):
+    """
+    Tune the hyperparameters of a scikit-learn model with Optuna, running trials in parallel processes.
+
+    suggest_model gets an Optuna trial and returns an unfitted model, ie::
+
+        def suggest_model(trial):
+            max_depth = trial.suggest_int("max_depth", 2, 32, log=True)
+            return sklearn.ensemble.RandomForestClassifier(max_depth=max_depth, n_estimators=10)
+
+    Each trial is scored with cross-validation and the mean score is reported after each fold, so the pruner can stop
+    trials that are not promising. X and y are copied once to shared memory that is used by all processes.
+
+    The processes are forked where possible, then suggest_model can be defined inside a function, ie in a stored
+    procedure. With other start methods it needs to be importable. Models should use one core, ie n_jobs=1, since
+    each process runs one trial at a time.
+
+    :param X: Features, ie from load_training_data
+    :param y: Target
+    :param suggest_model: Function returning a model with parameters suggested by the trial
+    :param n_trials: Total number of trials, split between the processes
+    :param cv: Number of folds or a scikit-learn cross-validation splitter
+    :param scoring: Scikit-learn scoring name or scorer, default is the score method of the model
+    :param direction: 'maximize' or 'minimize' the score
+    :param n_jobs: Number of processes, default is the number of cores available
+    :param sampler: Optuna sampler copied to each process and reseeded in each of them, so runs with a given
+                    sampler are not reproducible. Default is TPESampler with a different seed per process
+    :param pruner: Optuna pruner, default is MedianPruner
+    :param seed: Seed of the default sampler
+    :param timeout: Maximum number of seconds each process runs trials
+    :param storage_path: Journal file for the study, it can be used to continue a study. A temporary file is used if
+                         not provided
+    :param study_name: Name of the study in the journal file
+    :param refit: If True the model with the best parameters is fitted on all of X and y
+    :return: Tuple with the fitted best model, None if refit is False, and the Optuna study
+    """
+    import optuna
+
+    if n_trials < 1:
+        raise ValueError("n_trials needs to be at least 1")
+    if len(X) != len(y):
+        raise ValueError(f"X has {len(X)} rows and y has {len(y)} rows")
+
+    n_jobs = min(n_jobs or _get_nbr_cores(), n_trials)
+    pruner = pruner or optuna.pruners.MedianPruner()
+
+    temp_dir = None
+    if storage_path is None:
+        temp_dir = tempfile.mkdtemp()
+        storage_path = os.path.join(temp_dir, _JOURNAL_FILE)
+    study_name = study_name or f"tune_model_{uuid.uuid4().hex}"
+
+    optuna.create_study(study_name=study_name, storage=_get_journal_storage(storage_path),
+                        direction=direction, pruner=pruner, load_if_exists=True)
+
+    shared = []
+    try:
+        x_shm, x_spec = _to_shared_memory(X)
+        shared.append(x_shm)
+        y_shm, y_spec = _to_shared_memory(y)
+        shared.append(y_shm)
+
+        settings = {"study_name": study_name, "storage_path": storage_path, "sampler": sampler, "pruner": pruner,
+                    "seed": seed, "cv": cv, "scoring": scoring, "timeout": timeout}
+        context = get_context("fork") if "fork" in get_all_start_methods() else get_context()
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context, initializer=_init_worker,
+                                 initargs=(x_spec, y_spec, suggest_model, settings)) as executor:
+            futures = [executor.submit(_run_worker, n_trials // n_jobs + (idx < n_trials % n_jobs), idx)
+                       for idx in range(n_jobs)]
+            for future in futures:
+                future.result()
+
+        # Reload the study to get the trials run by the processes, kept in memory if the journal file is temporary
+        storage = _get_journal_storage(storage_path)
+        if temp_dir is not None:
+            memory_storage = optuna.storages.InMemoryStorage()
+            optuna.copy_study(from_study_name=study_name, from_storage=storage, to_storage=memory_storage)
+            storage = memory_storage
+        study = optuna.load_study(study_name=study_name, storage=storage)
+    finally:
+        for shm in shared:
+            shm.close()
+            shm.unlink()
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    best_model = None
+    if refit:
+        if not any(trial.state == optuna.trial.TrialState.COMPLETE for trial in study.trials):
+            raise ValueError(f"No trial of the study {study_name} completed, all {len(study.trials)} trials were "
+                             f"pruned or failed")
+        best_model = suggest_model(optuna.trial.FixedTrial(study.best_params)).fit(X, y)
+
+    return best_model, study
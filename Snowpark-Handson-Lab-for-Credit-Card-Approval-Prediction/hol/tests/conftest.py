@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+import snowflake.snowpark.functions as F
+from snowflake.snowpark import Session
+from snowflake.snowpark import types as T
+from snowflake.snowpark.mock import patch
+from snowflake.snowpark.mock._functions import ColumnEmulator, ColumnType
+
+# Number of HASH calls evaluated by local testing, reset by the mock_hash fixture
+_HASH_CALLS = []
+
+
+@patch(F.hash)
+def _mock_hash(*cols):
+    # HASH is not available in local testing, any deterministic 64 bit hash of the values works for the tests
+    _HASH_CALLS.append(len(cols))
+    values = pd.concat([pd.Series(col).reset_index(drop=True) for col in cols], axis=1)
+    hashes = pd.util.hash_pandas_object(values, index=False).astype("int64")
+    return ColumnEmulator(data=hashes.values, sf_type=ColumnType(T.LongType(), False))
+
+
+@patch(F.var_pop)
+def _mock_var_pop(col):
+    # VAR_POP is not available in local testing
+    return ColumnEmulator(data=[pd.Series(col, dtype=float).var(ddof=0)], sf_type=ColumnType(T.DoubleType(), True))
+
+
+@pytest.fixture(scope="session")
+def session():
+    # Local testing session, no Snowflake account needed
+    session = Session.builder.config("local_testing", True).create()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def mock_hash():
+    # HASH is emulated in local testing, returns the list of evaluated calls
+    _HASH_CALLS.clear()
+    return _HASH_CALLS
@@ -0,0 +1,29 @@
+import pytest
+
+from preprocessing import benchmarks
+
+
+def test_sql_depth_ignores_string_literals():
+    assert benchmarks._sql_depth("SELECT IFF((A > 1), ')(', (B))") == 2
+
+
+def test_measure_sql_needs_snowflake_session(session):
+    make_transformer = benchmarks._SCALERS["MinMaxScaler"]
+
+    with pytest.raises(ValueError, match="Snowflake session"):
+        benchmarks.benchmark_transformer(make_transformer, 2, nbr_rows=10, session=session)
+    with pytest.raises(ValueError, match="Snowflake session"):
+        benchmarks.benchmark_transformer(make_transformer, 2, nbr_rows=10)
+
+
+def test_local_testing_benchmarks(session):
+    result = benchmarks.run_benchmarks(session, columns=[2], categories=[5], nbr_rows=10, measure_sql=False,
+                                       transformers=["MinMaxScaler", "OrdinalEncoder(join)", "HashingEncoder"])
+
+    measured = result[result["unsupported"].isna()]
+    assert measured["transformer"].tolist() == ["MinMaxScaler", "OrdinalEncoder(join)", "OrdinalEncoder(join)"]
+    assert measured["snowpark_transform_time"].notna().all()
+    assert "sql_length" not in result.columns
+
+    unsupported = result[result["unsupported"].notna()]
+    assert unsupported["transformer"].tolist() == ["HashingEncoder"]
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+import snowflake.snowpark.functions as F
+
+import preprocessing
+
+
+def test_hashing_encoder_hashes_each_column_once(session, mock_hash, monkeypatch):
+    # MD5_NUMBER_LOWER64 can not be emulated in local testing, HASH is used in its place
+    monkeypatch.setattr(F, "call_builtin", lambda name, *args: F.hash(*args))
+    pdf = pd.DataFrame({"A": ["x", "y"], "B": ["1", "2"], "C": [1.0, 2.0]})
+    encoder = preprocessing.HashingEncoder(input_cols=["A", "B"], n_features=16).fit(pdf)
+    result = encoder.transform(session.create_dataframe(pdf)).to_pandas()
+
+    assert list(result.columns) == ["C"] + [f"HASH_{idx}" for idx in range(16)]
+    assert result.drop(columns="C").sum(axis=1).tolist() == [2, 2]
+    # One hash per input column, not one per input column and output column
+    assert len(mock_hash) == 2
+
+
+def _get_category_df():
+    return pd.DataFrame({"A": ["x", "y", "x", None, "z"], "B": ["1", "2", "2", "1", "3"], "C": [1.0, 2.0, 3.0, 4.0, 5.0]})
+
+
+def test_one_hot_transform_is_one_projection(session, monkeypatch):
+    from snowflake.snowpark import DataFrame
+
+    pdf = _get_category_df()
+    encoder = preprocessing.OneHotEncoder(input_cols=["A", "B"]).fit(pdf)
+    df = session.create_dataframe(pdf)
+
+    projections = []
+    with_columns = DataFrame.with_columns
+
+    def counting_with_columns(self, col_names, values, **kwargs):
+        projections.append(col_names)
+        return with_columns(self, col_names, values, **kwargs)
+
+    def fail_with_column(self, *args, **kwargs):
+        raise AssertionError("One projection per indicator column")
+
+    monkeypatch.setattr(DataFrame, "with_columns", counting_with_columns)
+    monkeypatch.setattr(DataFrame, "with_column", fail_with_column)
+    result = encoder.transform(df).to_pandas()
+
+    assert len(projections) == 1
+    assert list(result.columns) == ["C", "A_X", "A_Y", "A_Z", "B_1", "B_2", "B_3"]
+    expected = encoder.transform(pdf)
+    assert (result.drop(columns="C").to_numpy() == expected.drop(columns="C").to_numpy()).all()
+
+
+def test_ordinal_join_strategy_matches_case(session, monkeypatch):
+    from snowflake.snowpark import DataFrame
+
+    pdf = _get_category_df()
+    fit_df = pd.DataFrame({"A": ["x", "y", "w"], "B": ["1", "1", "2"]})
+    df = session.create_dataframe(pdf)
+
+    joins = []
+    join = DataFrame.join
+
+    def counting_join(self, *args, **kwargs):
+        joins.append(args)
+        return join(self, *args, **kwargs)
+
+    monkeypatch.setattr(DataFrame, "join", counting_join)
+
+    def encode(**kwargs):
+        encoder = preprocessing.OrdinalEncoder(input_cols=["A", "B"], handle_unknown="use_encoded_value",
+                                               unknown_value=-1, **kwargs).fit(fit_df)
+        # The join does not keep the order of the rows
+        return encoder.transform(df).to_pandas().sort_values("C").reset_index(drop=True)[["A", "B", "C"]]
+
+    expected = encode(strategy="case")
+    assert len(joins) == 0
+    # With 'auto' only A, that has more categories than join_threshold, is joined
+    pd.testing.assert_frame_equal(encode(join_threshold=2), expected)
+    assert len(joins) == 1
+    pd.testing.assert_frame_equal(encode(strategy="join"), expected)
+    assert len(joins) == 3
+    # The unknown category z and the unknown label 3
+    assert expected["A"].tolist()[-1] == -1 and expected["B"].tolist()[-1] == -1
+
+
+def test_infrequent_categories(session):
+    # Local testing can not FLATTEN the frequency aggregation, the categories are fitted by the local backend
+    pdf = pd.DataFrame({"A": ["x", "x", "x", "y", "y", "z", None], "C": range(7)})
+    df = session.create_dataframe(pdf)
+
+    one_hot = preprocessing.OneHotEncoder(input_cols="A", max_categories=2).fit(pdf)
+    assert one_hot.fitted_values_ == {"A": ["x", "y"]}
+    result = one_hot.transform(df).to_pandas().sort_values("C")
+    assert list(result.columns) == ["C", "A_X", "A_Y", "A__INFREQUENT"]
+    # Local testing evaluates NOT (NULL IN (...)) to TRUE, so NULL is only checked with the local backend
+    assert result["A__INFREQUENT"].tolist()[:6] == [0, 0, 0, 0, 0, 1]
+    assert one_hot.transform(pdf)["A__infrequent"].tolist() == [0, 0, 0, 0, 0, 1, 0]
+
+    ordinal = preprocessing.OrdinalEncoder(input_cols="A", min_frequency=0.3).fit(pdf)
+    assert ordinal.fitted_values_ == {"A": ["x", "y"]}
+    ordinal = preprocessing.OrdinalEncoder(input_cols="A", min_frequency=3).fit(pdf)
+    assert ordinal.fitted_values_ == {"A": ["x"]}
+    result = ordinal.transform(df).to_pandas().sort_values("C")
+    # Infrequent categories get the number of kept categories, NULL stays NULL
+    assert result["A"].tolist()[:6] == [0, 0, 0, 1, 1, 1]
+    assert pd.isna(result["A"].tolist()[6])
+
+
+def test_one_hot_sparse_output_matches_dense():
+    # ARRAY_CONSTRUCT_COMPACT is not available in local testing, the sparse output is checked with the local backend
+    pdf = _get_category_df()
+    fit_df = pdf.iloc[:4]
+    dense = preprocessing.OneHotEncoder(input_cols=["A", "B"], handle_unknown="keep").fit(fit_df)
+    sparse = preprocessing.OneHotEncoder(input_cols=["A", "B"], handle_unknown="keep", output="sparse").fit(fit_df)
+
+    feature_names = sparse.get_feature_names()
+    assert feature_names == ["A_x", "A_y", "A__unknown", "B_1", "B_2", "B__unknown"]
+
+    result = sparse.transform(pdf)
+    assert list(result.columns) == ["C", "ONE_HOT_INDICES"]
+    matrix = preprocessing.sparse_to_csr(result["ONE_HOT_INDICES"], len(feature_names))
+    expected = dense.transform(pdf)[feature_names].to_numpy()
+    assert (matrix.toarray() == expected).all()
+
+
+def test_ordinal_inverse_transform(session, monkeypatch):
+    # AS_CHAR is not available in local testing, and GET with a negative index does not return NULL as in Snowflake,
+    # so unknown values are only decoded by the join strategy and the local backend
+    monkeypatch.setattr(F, "as_char", F.to_varchar)
+    pdf = _get_category_df()
+    df = session.create_dataframe(pdf)
+    expected = [["x", "1"], ["y", "2"], ["x", "2"], [None, "1"], [None, None]]
+
+    for strategy in ["case", "join"]:
+        encoder = preprocessing.OrdinalEncoder(input_cols=["A", "B"], handle_unknown="use_encoded_value",
+                                               unknown_value=-1, strategy=strategy).fit(pdf.iloc[:3])
+        result = encoder.inverse_transform(encoder.transform(df)).to_pandas().sort_values("C")
+        assert list(result.columns) == ["C", "A", "B"]
+        nbr_rows = 5 if strategy == "join" else 3
+        assert result[["A", "B"]].replace({np.nan: None}).values.tolist()[:nbr_rows] == expected[:nbr_rows]
+
+        result = encoder.inverse_transform(encoder.transform(pdf))
+        assert result[["A", "B"]].replace({np.nan: None}).values.tolist() == expected
+
+
+def test_one_hot_sparse_inverse_transform():
+    pdf = _get_category_df()
+    encoder = preprocessing.OneHotEncoder(input_cols=["A", "B"], min_frequency=2, output="sparse").fit(pdf)
+    assert encoder.fitted_values_ == {"A": ["x"], "B": ["1", "2"]}
+
+    result = encoder.inverse_transform(encoder.transform(pdf))
+    # Infrequent values are decoded to NULL
+    assert result[["A", "B"]].replace({np.nan: None}).values.tolist() == \
+        [["x", "1"], [None, "2"], ["x", "2"], [None, "1"], [None, None]]
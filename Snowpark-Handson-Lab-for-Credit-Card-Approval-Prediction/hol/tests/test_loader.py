@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from snowflake.snowpark import types as T
+
+import preprocessing
+
+
+def _get_df(session):
+    rng = np.random.default_rng(0)
+    pdf = pd.DataFrame({"A": rng.normal(size=25), "B": rng.normal(size=25), "TARGET": rng.integers(0, 2, 25)})
+    schema = T.StructType([T.StructField("A", T.DoubleType()), T.StructField("B", T.DoubleType()),
+                           T.StructField("TARGET", T.LongType())])
+    return pdf, session.create_dataframe(pdf.values.tolist(), schema=schema)
+
+
+def test_load_training_data(session):
+    pdf, df = _get_df(session)
+    X, y = preprocessing.load_training_data(df, target_col="TARGET")
+
+    assert X.dtype == np.float32 and X.shape == (25, 2)
+    # Integer targets are kept as integers
+    assert y.dtype == np.int64
+    np.testing.assert_allclose(X, pdf[["A", "B"]].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(y, pdf["TARGET"].to_numpy())
+
+    X, y = preprocessing.load_training_data(df, feature_cols=["B"], dtype=np.float64)
+    assert y is None
+    np.testing.assert_array_equal(X[:, 0], pdf["B"].to_numpy())
+
+
+def test_iter_training_batches(session, monkeypatch):
+    from snowflake.snowpark import DataFrame
+
+    pdf, df = _get_df(session)
+    # Snowflake returns batches of its own size, the mini-batches span them
+    to_pandas = DataFrame.to_pandas
+    monkeypatch.setattr(DataFrame, "to_pandas_batches",
+                        lambda self: (batch for _, batch in to_pandas(self).groupby(np.arange(25) // 7)))
+    batches = list(preprocessing.iter_training_batches(df, target_col="TARGET", batch_size=10))
+
+    assert [len(X) for X, _ in batches] == [10, 10, 5]
+    np.testing.assert_allclose(np.concatenate([X for X, _ in batches]), pdf[["A", "B"]].to_numpy(dtype=np.float32))
+    np.testing.assert_array_equal(np.concatenate([y for _, y in batches]), pdf["TARGET"].to_numpy())
+
+    with pytest.raises(ValueError, match="batch_size"):
+        next(preprocessing.iter_training_batches(df, batch_size=0))
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import polars as pl
+
+import preprocessing
+
+
+def _get_pdf():
+    return pd.DataFrame({"A": [3.0, 1.0, 4.0, None, 5.0], "B": [-2.0, 7.0, 1.0, 8.0, 2.0],
+                         "CAT": ["x", "y", "x", None, "z"]})
+
+
+def test_local_fit_and_transform(session):
+    pdf = _get_pdf()
+    df = session.create_dataframe(pdf)
+    transformers = [(lambda: preprocessing.StandardScaler(input_cols=["A", "B"]), ["A", "B"]),
+                    (lambda: preprocessing.MaxAbsScaler(input_cols=["A", "B"]), ["A", "B"]),
+                    (lambda: preprocessing.OrdinalEncoder(input_cols="CAT"), ["CAT"])]
+    for get_transformer, cols in transformers:
+        fitted = get_transformer().fit(pdf)
+        polars_fitted = get_transformer().fit(pl.from_pandas(pdf))
+        assert polars_fitted.fitted_values_ == fitted.fitted_values_
+
+        result = fitted.transform(pl.from_pandas(pdf))
+        assert isinstance(result, pl.DataFrame)
+        # The encoders fitted locally give the same result in Snowflake
+        expected = fitted.transform(df).to_pandas()
+        for col in cols:
+            np.testing.assert_allclose(result[col].to_numpy().astype(float), expected[col].to_numpy().astype(float))
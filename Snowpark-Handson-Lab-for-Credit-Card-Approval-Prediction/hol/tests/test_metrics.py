@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+from sklearn import metrics as sk_metrics
+
+from preprocessing import metrics
+
+
+def _get_pdf():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 200)
+    score = np.clip(y_true * 0.3 + rng.random(200) * 0.7, 0, 1)
+    return pd.DataFrame({"Y_TRUE": y_true, "SCORE": score, "Y_PRED": (score >= 0.5).astype(int),
+                         "SEGMENT": rng.choice(["a", "b"], 200)})
+
+
+def _assert_metrics(row, y_true, y_pred):
+    assert [[row["TN"], row["FP"]], [row["FN"], row["TP"]]] == sk_metrics.confusion_matrix(y_true, y_pred).tolist()
+    assert np.isclose(row["ACCURACY"], sk_metrics.accuracy_score(y_true, y_pred))
+    assert np.isclose(row["PRECISION"], sk_metrics.precision_score(y_true, y_pred, zero_division=0))
+    assert np.isclose(row["RECALL"], sk_metrics.recall_score(y_true, y_pred))
+    assert np.isclose(row["F1"], sk_metrics.f1_score(y_true, y_pred))
+
+
+def test_classification_metrics_match_scikit_learn(session):
+    pdf = _get_pdf()
+    for df in [pdf, session.create_dataframe(pdf)]:
+        _assert_metrics(metrics.classification_metrics(df, "Y_TRUE", "Y_PRED").iloc[0], pdf["Y_TRUE"], pdf["Y_PRED"])
+        _assert_metrics(metrics.classification_metrics(df, "Y_TRUE", "SCORE", threshold=0.5).iloc[0],
+                        pdf["Y_TRUE"], pdf["Y_PRED"])
+
+    # Local testing evaluates IFF inside a grouped aggregation on the wrong rows, segments are checked locally
+    result = metrics.classification_metrics(pdf, "Y_TRUE", "Y_PRED", segment_cols="SEGMENT")
+    assert result["SEGMENT"].tolist() == ["a", "b"]
+    for _, row in result.iterrows():
+        segment = pdf[pdf["SEGMENT"] == row["SEGMENT"]]
+        _assert_metrics(row, segment["Y_TRUE"], segment["Y_PRED"])
+
+
+def test_threshold_metrics_match_scikit_learn(session, monkeypatch):
+    from snowflake.snowpark import DataFrame
+
+    collects = []
+    collect = DataFrame.collect
+
+    def counting_collect(self, *args, **kwargs):
+        collects.append(self)
+        return collect(self, *args, **kwargs)
+
+    monkeypatch.setattr(DataFrame, "collect", counting_collect)
+    pdf = _get_pdf()
+    thresholds = [0.2, 0.5, 0.8, 1.5]
+    for df in [pdf, session.create_dataframe(pdf)]:
+        result = metrics.threshold_metrics(df, "Y_TRUE", "SCORE", thresholds)
+        assert result["THRESHOLD"].tolist() == thresholds
+        for (_, row), threshold in zip(result.iterrows(), thresholds):
+            _assert_metrics(row, pdf["Y_TRUE"], (pdf["SCORE"] >= threshold).astype(int))
+
+    # All thresholds are counted in one query
+    assert len(collects) == 1
+
+
+def test_roc_pr_curve_matches_scikit_learn():
+    # Local testing has no WIDTH_BUCKET and evaluates IFF inside a grouped aggregation on the wrong rows, the curves
+    # are checked with the local backend
+    rng = np.random.default_rng(0)
+    pdf = _get_pdf()
+    # Scores on the lower edges of the buckets, so the bucketed curves are exact
+    pdf["SCORE"] = np.clip(pdf["Y_TRUE"] * 4 + rng.integers(0, 12, len(pdf)), 0, 15) / 16
+
+    curve, roc_auc, average_precision = metrics.roc_pr_curve(pdf, "Y_TRUE", "SCORE", nbr_buckets=16)
+
+    assert curve["THRESHOLD"].tolist() == [idx / 16 for idx in range(15, -1, -1)]
+    assert (curve["TP"] + curve["FN"] == pdf["Y_TRUE"].sum()).all()
+    assert np.isclose(roc_auc, sk_metrics.roc_auc_score(pdf["Y_TRUE"], pdf["SCORE"]))
+    assert np.isclose(average_precision, sk_metrics.average_precision_score(pdf["Y_TRUE"], pdf["SCORE"]))
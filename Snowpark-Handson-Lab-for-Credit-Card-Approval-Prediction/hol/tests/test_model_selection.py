@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from preprocessing.model_selection import stratified_split
+
+
+def _get_df(session):
+    rng = np.random.default_rng(0)
+    pdf = pd.DataFrame({"A": rng.normal(size=2000), "TARGET": (rng.random(2000) < 0.3).astype(int)})
+    return pdf, session.create_dataframe(pdf)
+
+
+@pytest.mark.parametrize("exact", [False, True])
+def test_stratified_split(session, mock_hash, exact):
+    pdf, df = _get_df(session)
+    train_df, test_df = stratified_split(df, "TARGET", [0.8, 0.2], seed=1, exact=exact)
+    train, test = train_df.to_pandas(), test_df.to_pandas()
+
+    assert list(train.columns) == ["A", "TARGET"]
+    assert len(train) + len(test) == len(pdf)
+    assert not set(train["A"]) & set(test["A"])
+    # Local testing can return NULL for the other columns of filtered rows, so the target is looked up by A
+    train_target = pdf.set_index("A").loc[train["A"], "TARGET"]
+    for target, count in pdf["TARGET"].value_counts().items():
+        nbr_train = (train_target == target).sum()
+        if exact:
+            assert nbr_train == int(count * 0.8)
+        else:
+            assert abs(nbr_train / count - 0.8) < 0.05
+
+    train_again, _ = stratified_split(df, "TARGET", [0.8, 0.2], seed=1, exact=exact)
+    assert set(train_again.to_pandas()["A"]) == set(train["A"])
+
+
+def test_default_split_is_stratified_for_rare_classes(session, mock_hash):
+    pdf = pd.DataFrame({"A": np.arange(200, dtype=float), "TARGET": [1] * 10 + [0] * 190})
+    train_df, _ = stratified_split(session.create_dataframe(pdf), "TARGET", [0.8, 0.2], seed=3)
+
+    train_target = pdf.set_index("A").loc[train_df.to_pandas()["A"], "TARGET"]
+    assert (train_target == 1).sum() == 8
+    assert (train_target == 0).sum() == 152
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import preprocessing
+from preprocessing import _persistence
+
+
+@pytest.fixture
+def fit_cache(tmp_path, monkeypatch):
+    # Local testing has no INFORMATION_SCHEMA, the table fingerprint is returned from fingerprint["value"]
+    fingerprint = {"value": {"table": "DB.SCHEMA.T", "row_count": 3, "last_altered": "1"}, "queries": 0}
+
+    def query_table_fingerprint(df):
+        fingerprint["queries"] += 1
+        return fingerprint["value"]
+
+    monkeypatch.setattr(_persistence, "_query_table_fingerprint", query_table_fingerprint)
+    preprocessing.set_fit_cache(str(tmp_path / "cache"))
+    yield fingerprint
+    preprocessing.set_fit_cache(None)
+
+
+def test_save_load_round_trip(tmp_path):
+    pdf = pd.DataFrame({"A": [1.0, 5.0, 3.0], "C": ["x", "y", "x"]})
+    pipeline = preprocessing.Pipeline([preprocessing.MinMaxScaler(input_cols=["A"]),
+                                       preprocessing.OneHotEncoder(input_cols=["C"])]).fit(pdf)
+    pipeline.save(str(tmp_path / "pipeline.json"))
+    scaler = pipeline.steps[0]
+    scaler.save(str(tmp_path / "scaler.json"))
+
+    pd.testing.assert_frame_equal(preprocessing.Pipeline.load(str(tmp_path / "pipeline.json")).transform(pdf),
+                                  pipeline.transform(pdf))
+    pd.testing.assert_frame_equal(preprocessing.MinMaxScaler.load(str(tmp_path / "scaler.json")).transform(pdf),
+                                  scaler.transform(pdf))
+    with pytest.raises(ValueError):
+        preprocessing.OneHotEncoder.load(str(tmp_path / "scaler.json"))
+    with pytest.raises(FileNotFoundError):
+        preprocessing.MinMaxScaler.load(str(tmp_path / "missing.json"))
+
+
+def test_stage_path_needs_file_name(session):
+    with pytest.raises(ValueError, match="file name"):
+        preprocessing.MinMaxScaler().save("@stage", session)
+    with pytest.raises(ValueError, match="file name"):
+        preprocessing.MinMaxScaler.load("@stage/", session)
+
+
+def test_fit_cache(session, fit_cache, tmp_path):
+    session.create_dataframe(pd.DataFrame({"A": [1.0, 5.0, 3.0], "B": [2.0, 4.0, 8.0]})) \
+        .write.save_as_table("CACHE_TEST", mode="overwrite")
+    df = session.table("CACHE_TEST")
+
+    def fit():
+        return preprocessing.fit_all([preprocessing.MinMaxScaler(input_cols=["A"]),
+                                      preprocessing.MinMaxScaler(input_cols=["B"])], df)
+
+    scalers = fit()
+    # One metadata query for all transformers fitted together
+    assert fit_cache["queries"] == 1
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+
+    cached = fit()
+    assert fit_cache["queries"] == 2
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    for scaler, cached_scaler in zip(scalers, cached):
+        assert cached_scaler.fitted_values_ == scaler.fitted_values_
+
+    # A changed table gets new cache entries
+    fit_cache["value"] = {**fit_cache["value"], "row_count": 4}
+    fit()
+    assert len(list((tmp_path / "cache").iterdir())) == 4
+    assert np.isclose(scalers[0].fitted_values_["A"]["max"], 5.0)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+import preprocessing
+from preprocessing._pipeline import _get_step_cols
+
+
+def _get_df(session):
+    rng = np.random.default_rng(0)
+    pdf = pd.DataFrame({"A": rng.normal(10, 3, 50), "B": rng.normal(size=50)})
+    return session.create_dataframe(pdf)
+
+
+def test_pipeline_fit_matches_steps_one_by_one(session):
+    df = _get_df(session)
+    pipeline = preprocessing.Pipeline([preprocessing.MinMaxScaler(),
+                                       preprocessing.MinMaxScaler(feature_range=(-1, 1), input_cols=["A"])])
+    pipeline.fit(df)
+
+    steps = [preprocessing.MinMaxScaler(), preprocessing.MinMaxScaler(feature_range=(-1, 1), input_cols=["A"])]
+    step_df = df
+    for step in steps:
+        step_df = step.fit(step_df).transform(step_df)
+
+    for pipeline_step, step in zip(pipeline.steps, steps):
+        for col, values in step.fitted_values_.items():
+            for key, value in values.items():
+                assert np.isclose(pipeline_step.fitted_values_[col][key], value)
+
+    result = pipeline.transform(df).to_pandas()
+    expected = step_df.to_pandas()
+    np.testing.assert_allclose(result[["A", "B"]].to_numpy(), expected[["A", "B"]].to_numpy())
+
+
+def test_step_cols_with_one_hot_output_dict():
+    assert _get_step_cols(None) is None
+    assert _get_step_cols("a") == {"A"}
+    assert _get_step_cols({"A": ["A_X", "B"], "C": "C_Y"}) == {"A_X", "B", "C_Y"}
+
+
+def test_fit_all_runs_one_query(session, monkeypatch):
+    from snowflake.snowpark import DataFrame
+
+    df = _get_df(session)
+    collects = []
+    collect = DataFrame.collect
+
+    def counting_collect(self, *args, **kwargs):
+        collects.append(self)
+        return collect(self, *args, **kwargs)
+
+    monkeypatch.setattr(DataFrame, "collect", counting_collect)
+    scalers = preprocessing.fit_all([preprocessing.MinMaxScaler(input_cols=["A"]),
+                                     preprocessing.MinMaxScaler(feature_range=(-1, 1), input_cols=["B"]),
+                                     preprocessing.StandardScaler(input_cols=["A", "B"])], df)
+    assert len(collects) == 1
+
+    expected = [preprocessing.MinMaxScaler(input_cols=["A"]).fit(df),
+                preprocessing.MinMaxScaler(feature_range=(-1, 1), input_cols=["B"]).fit(df),
+                preprocessing.StandardScaler(input_cols=["A", "B"]).fit(df)]
+    for scaler, expected_scaler in zip(scalers, expected):
+        for col, values in expected_scaler.fitted_values_.items():
+            for key, value in values.items():
+                assert np.isclose(scaler.fitted_values_[col][key], value)
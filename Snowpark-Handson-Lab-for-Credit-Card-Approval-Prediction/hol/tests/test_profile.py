@@ -0,0 +1,19 @@
+import pandas as pd
+
+import preprocessing
+
+
+def test_profile(session):
+    pdf = pd.DataFrame({"A": [1, 2, 2, None], "B": ["x", "x", "x", "x"], "C": [1.5, None, 2.5, 3.5]})
+    result = preprocessing.profile(session.create_dataframe(pdf), exact=True).set_index("COLUMN_NAME")
+
+    assert result.loc["A", "NULL_COUNT"] == 1
+    assert result.loc["A", "DISTINCT_COUNT"] == 2
+    assert result.loc["C", "MEAN"] == 2.5
+    assert pd.isna(result.loc["B", "MEAN"])
+    assert result["IS_CONSTANT"].tolist() == [False, True, False]
+
+    local = preprocessing.profile(pdf).set_index("COLUMN_NAME")
+    for col in ["NULL_COUNT", "DISTINCT_COUNT", "IS_CONSTANT"]:
+        assert local[col].tolist() == result[col].tolist()
+    assert local.loc["C", "MEAN"] == 2.5
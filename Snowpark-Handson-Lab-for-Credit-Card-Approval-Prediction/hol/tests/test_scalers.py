@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+import preprocessing
+
+
+def test_min_max_partial_fit_matches_fit(session):
+    pdf = pd.DataFrame({"A": [3.0, 1.0, 4.0, 1.0, 5.0, 9.0], "B": [2.0, 2.0, 2.0, 2.0, 2.0, 2.0],
+                        "C": [None, None, None, None, None, 6.0]})
+    df = session.create_dataframe(pdf)
+
+    # Single row chunks, constant columns and columns with only NULL
+    scaler = preprocessing.MinMaxScaler(input_cols=["A", "B", "C"])
+    for idx in range(len(pdf)):
+        scaler.partial_fit(session.create_dataframe(pdf.iloc[[idx]]))
+    scaler.partial_fit(df.filter(df["A"] > 100))
+
+    expected = preprocessing.MinMaxScaler(input_cols=["A", "B", "C"]).fit(df)
+    for col in ["A", "B", "C"]:
+        for key in ["max", "min", "scale", "min_"]:
+            assert np.isclose(scaler.fitted_values_[col][key], expected.fitted_values_[col][key])
+    assert scaler.fitted_values_["B"]["scale"] == 1
+
+
+def test_min_max_fit_matches_local(session):
+    pdf = pd.DataFrame({"A": [3.0, 1.0, 4.0], "B": [2.0, 2.0, 2.0]})
+    scaler = preprocessing.MinMaxScaler(feature_range=(-1, 1)).fit(session.create_dataframe(pdf))
+    local_scaler = preprocessing.MinMaxScaler(feature_range=(-1, 1)).fit(pdf)
+
+    np.testing.assert_allclose(scaler.transform(session.create_dataframe(pdf)).to_pandas()[["A", "B"]].to_numpy(),
+                               local_scaler.transform(pdf)[["A", "B"]].to_numpy())
+
+
+def test_robust_scaler_sample_is_deterministic(session, mock_hash):
+    rng = np.random.default_rng(0)
+    pdf = pd.DataFrame({"A": rng.normal(size=1000), "B": rng.normal(size=1000)})
+    df = session.create_dataframe(pdf)
+
+    # Local testing can not aggregate a filtered DataFrame into an object, so the sampled rows are checked directly
+    def get_sample(seed):
+        return set(preprocessing.RobustScaler(sample_fraction=0.3, seed=seed)._sample(df).to_pandas()["A"])
+
+    sample = get_sample(1)
+    assert abs(len(sample) - 300) < 50
+    assert get_sample(1) == sample
+    assert get_sample(2) != sample
+    assert preprocessing.RobustScaler(sample_fraction=0.3)._get_fit_exprs(df) is None
+
+
+def _assert_same_values(fitted_values, expected_values, keys):
+    # Local testing returns NaN where Snowflake returns NULL
+    for col, values in expected_values.items():
+        for key in keys:
+            value, expected = fitted_values[col][key], values[key]
+            if expected is None or np.isnan(expected):
+                assert value is None or np.isnan(value)
+            else:
+                assert np.isclose(value, expected)
+
+
+def test_standard_partial_fit_matches_fit(session, monkeypatch):
+    pdf = pd.DataFrame({"A": [3.0, 1.0, 4.0, 1.0, 5.0, 9.0], "B": [None, None, None, None, None, 6.0]})
+    df = session.create_dataframe(pdf)
+
+    scaler = preprocessing.StandardScaler(input_cols=["A", "B"]).fit(session.create_dataframe(pdf.iloc[[0]]))
+    # The chunks are aggregated directly, without the fit cache
+    monkeypatch.setattr(preprocessing._scalers, "_get_fit_cache_path", None)
+    for idx in range(1, len(pdf)):
+        scaler.partial_fit(session.create_dataframe(pdf.iloc[[idx]]))
+    scaler.partial_fit(df.filter(df["A"] > 100))
+
+    expected = preprocessing.StandardScaler(input_cols=["A", "B"]).fit(pdf)
+    _assert_same_values(scaler.fitted_values_, expected.fitted_values_, ["mean", "scale"])
+    # STDDEV of one value is NULL
+    assert expected.fitted_values_["B"]["scale"] is None
+
+
+def test_partial_fit_local_chunks():
+    import polars as pl
+
+    pdf = pd.DataFrame({"A": [3.0, 1.0, 4.0, 1.0, 5.0, 9.0], "B": [2.0, None, 7.0, 2.0, None, 6.0]})
+    for scaler_cls, keys in [(preprocessing.MinMaxScaler, ["min", "max", "scale", "min_"]),
+                             (preprocessing.StandardScaler, ["mean", "scale"])]:
+        scaler = scaler_cls(input_cols=["A", "B"]).partial_fit(pdf.iloc[:2])
+        scaler.partial_fit(pl.from_pandas(pdf.iloc[2:4]))
+        scaler.partial_fit(pdf.iloc[4:])
+
+        _assert_same_values(scaler.fitted_values_, scaler_cls(input_cols=["A", "B"]).fit(pdf).fitted_values_, keys)
+
+
+def test_normalizer_matches_scikit_learn(session, monkeypatch):
+    from sklearn.preprocessing import Normalizer
+    import snowflake.snowpark.functions as F
+
+    # SQUARE is not available in local testing
+    monkeypatch.setattr(F, "square", lambda col: col * col)
+    rng = np.random.default_rng(0)
+    pdf = pd.DataFrame(rng.normal(size=(20, 7)), columns=[f"X{idx}" for idx in range(7)])
+    df = session.create_dataframe(pdf)
+
+    for norm in ["l1", "l2", "max"]:
+        result = preprocessing.Normalizer(norm=norm).fit(df).transform(df).to_pandas()
+        expected = Normalizer(norm=norm).fit_transform(pdf)
+        # The norm column is dropped
+        assert list(result.columns) == list(pdf.columns)
+        np.testing.assert_allclose(result.to_numpy(), expected)
+        np.testing.assert_allclose(preprocessing.Normalizer(norm=norm).fit(pdf).transform(pdf).to_numpy(), expected)
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from snowflake.snowpark import types as T
+
+from preprocessing.scoring import _get_input_types
+
+
+def test_input_types_from_schema(session):
+    df = session.create_dataframe(pd.DataFrame({"A": [1.0], "B": ["x"]}))
+
+    assert _get_input_types(["b", "A"], None, df) == [T.StringType(), T.DoubleType()]
+    assert _get_input_types(["A", "B"], None, None) == [T.FloatType(), T.FloatType()]
+    with pytest.raises(ValueError):
+        _get_input_types(["A"], [T.StringType(), T.FloatType()], None)
+
+
+def test_score_function_compiles_preprocessors_once(tmp_path, monkeypatch):
+    from joblib import dump
+    from sklearn.linear_model import LinearRegression
+
+    import preprocessing
+    from preprocessing import scoring
+
+    pdf = pd.DataFrame({"A": [1.0, 2.0, 3.0]})
+    scaler = preprocessing.MinMaxScaler(input_cols=["A"], output_cols=["A"]).fit(pdf)
+    model_path = str(tmp_path / "model.joblib")
+    dump(LinearRegression().fit(scaler.transform(pdf).to_numpy(), [1.0, 2.0, 3.0]), model_path)
+
+    plans = []
+
+    class CountingPlan(scoring.UdfTransformPlan):
+        def __init__(self, udf_encoders):
+            plans.append(self)
+            super().__init__(udf_encoders)
+
+    monkeypatch.setattr(scoring, "UdfTransformPlan", CountingPlan)
+    score = scoring.make_score_function(model_path, ["A"], [scaler])
+
+    for _ in range(3):
+        assert score(pdf).round(6).tolist() == [1.0, 2.0, 3.0]
+    assert len(plans) == 1
@@ -0,0 +1,42 @@
+import numpy as np
+import optuna
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from preprocessing.tuning import tune_model
+
+
+def _get_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    return X, (X[:, 0] + rng.normal(scale=0.5, size=200) > 0).astype(np.int64)
+
+
+def _suggest_model(trial):
+    return LogisticRegression(C=trial.suggest_float("C", 1e-3, 1e3, log=True))
+
+
+def test_tune_model():
+    X, y = _get_data()
+    best_model, study = tune_model(X, y, _suggest_model, n_trials=6, n_jobs=2, seed=0)
+
+    assert len(study.trials) == 6
+    assert best_model.C == study.best_params["C"]
+    assert best_model.predict(X).shape == (200,)
+
+
+def test_sampler_is_reseeded_per_process():
+    X, y = _get_data()
+    _, study = tune_model(X, y, _suggest_model, n_trials=2, n_jobs=2, sampler=optuna.samplers.RandomSampler(seed=0),
+                          refit=False)
+
+    assert study.trials[0].params["C"] != study.trials[1].params["C"]
+
+
+def test_no_completed_trial():
+    def suggest_pruned(trial):
+        raise optuna.TrialPruned()
+
+    X, y = _get_data()
+    with pytest.raises(ValueError, match="pruned or failed"):
+        tune_model(X, y, suggest_pruned, n_trials=2, n_jobs=1)
@@ -0,0 +1,73 @@
+import copy
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+import preprocessing
+from preprocessing import _udf
+
+
+def _get_udf_encoder():
+    pdf = pd.DataFrame({"A": [1.0, 2.0, 3.0]})
+    return preprocessing.MinMaxScaler().fit(pdf).get_udf_encoder()
+
+
+def test_compile_udf_encoders_cache_by_content():
+    udf_encoder = _get_udf_encoder()
+    plan = preprocessing.compile_udf_encoders(udf_encoder)
+
+    assert preprocessing.compile_udf_encoders(copy.deepcopy(udf_encoder)) is plan
+
+    udf_encoder["fitted_values"]["scale"] = [1.0]
+    assert preprocessing.compile_udf_encoders(udf_encoder) is not plan
+
+
+def test_plan_cache_is_bounded():
+    udf_encoder = _get_udf_encoder()
+    for idx in range(_udf._PLAN_CACHE_SIZE + 5):
+        udf_encoder["fitted_values"]["min_"] = [float(idx)]
+        preprocessing.compile_udf_encoders(udf_encoder)
+
+    assert len(_udf._PLAN_CACHE) == _udf._PLAN_CACHE_SIZE
+
+
+def test_load_udf_plan_reloads_changed_file(tmp_path):
+    path = tmp_path / "encoders.json"
+    udf_encoder = _get_udf_encoder()
+    path.write_text(json.dumps([udf_encoder]))
+    plan = preprocessing.load_udf_plan(str(path))
+    assert preprocessing.load_udf_plan(str(path)) is plan
+
+    udf_encoder["fitted_values"]["scale"] = [1.0]
+    path.write_text(json.dumps([udf_encoder]))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert preprocessing.load_udf_plan(str(path)) is not plan
+
+
+def test_values_formatted_as_to_varchar():
+    values = pd.Series([1.0, 2.5, None, 1 / 3, 1e20])
+
+    assert _udf._to_varchar(values).tolist() == ["1", "2.5", None, "0.333333333333333", "1e+20"]
+    assert _udf._to_varchar(pd.Series([True, False])).tolist() == ["true", "false"]
+    assert _udf._to_varchar(pd.Series(["a", None])).tolist() == ["a", None]
+    assert _udf._to_varchar(pd.Series([1, None], dtype="Int64")).tolist() == ["1", None]
+
+
+def test_lookup_matches_sql_categories():
+    # Categories fitted in Snowflake on an integer column, which is float64 in pandas when it has NULL values
+    lookup = _udf._Lookup(["1", "2", "10"])
+
+    assert lookup.index(pd.Series([2.0, 10.0, None, 3.0])).tolist() == [1, 2, -1, -1]
+
+
+def test_hashing_buckets_match_sql():
+    # MD5_NUMBER_LOWER64('A=' || TO_VARCHAR(A)) % 16 of the integer 1
+    expected = int.from_bytes(hashlib.md5("A=1".encode("utf-8")).digest()[8:], "big") % 16
+    step = _udf._HashingStep({"input_features": ["A"], "output_cols": [f"H_{idx}" for idx in range(16)],
+                              "fitted_values": {"n_features": 16}})
+
+    for values in [pd.Series([1, None], dtype="Int64"), pd.Series([1.0, None]), pd.Series(["1", None])]:
+        assert step._buckets("A", values).tolist() == [expected, -1]
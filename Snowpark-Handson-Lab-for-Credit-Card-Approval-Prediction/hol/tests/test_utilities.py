@@ -0,0 +1,41 @@
+import pandas as pd
+
+from snowflake.snowpark import DataFrame
+
+import preprocessing
+from preprocessing._utilities import _SCHEMA_CACHE, _derive_columns, _get_columns, _seed_columns
+
+
+def test_chained_transforms_describe_once(session, monkeypatch):
+    pdf = pd.DataFrame({"A": ["x", "y", "x"], "B": ["1", "2", "2"], "C": [1.0, 2.0, 3.0]})
+    one_hot = preprocessing.OneHotEncoder(input_cols="A").fit(pdf)
+    ordinal = preprocessing.OrdinalEncoder(input_cols="B", output_cols="B_IDX").fit(pdf)
+    scaler = preprocessing.MinMaxScaler(input_cols=["C"]).fit(pdf)
+    df = session.create_dataframe(pdf)
+
+    describes = []
+    schema = DataFrame.schema
+
+    def counting_schema(self):
+        describes.append(self)
+        return schema.func(self)
+
+    monkeypatch.setattr(DataFrame, "schema", property(counting_schema))
+    _get_columns(df)
+    result_df = scaler.transform(ordinal.transform(one_hot.transform(df)))
+    # The columns checked by inverse_transform are derived from the ones of the source DataFrame
+    ordinal.inverse_transform(one_hot.inverse_transform(scaler.inverse_transform(result_df)))
+    assert describes == [df]
+    assert _get_columns(result_df) == ["B", "A_X", "A_Y", "B_IDX", "C"]
+    monkeypatch.undo()
+    assert result_df.columns == _get_columns(result_df)
+
+
+def test_derive_columns():
+    df = object.__new__(DataFrame)
+    assert _derive_columns(df, ["D"]) is None
+
+    _seed_columns(df, ["A", '"b"', "C"])
+    assert _SCHEMA_CACHE[df]["columns"] == ["A", '"b"', "C"]
+    # Replaced columns are moved to the end as by with_columns
+    assert _derive_columns(df, ["a", "D"], ["C"]) == ['"b"', "a", "D"]